@@ -1,14 +1,17 @@
 import os
-from langchain.agents import initialize_agent, Tool
-from langchain.chat_models import ChatOpenAI
-from tools.compile import run_build
+from tools.compile import run_build, run_build_async
 from tools.edit_file import read_file, write_file
-from tools.diagnose import idf_doctor
+from tools.diagnose import idf_doctor, idf_doctor_async
+from tools.pipeline import run_pipeline, run_pipeline_async
 
 def tool_compile(_):
     """Tool to compile ESP-IDF project"""
     return run_build()
 
+async def atool_compile(_):
+    """Async variant of tool_compile (does not block the event loop)"""
+    return await run_build_async()
+
 def tool_read_main(_):
     """Tool to read main.c file"""
     return read_file("main/main.c")
@@ -25,14 +28,41 @@ def tool_doctor(_):
     """Tool to run environment diagnostics"""
     return idf_doctor()
 
+async def atool_doctor(_):
+    """Async variant of tool_doctor (does not block the event loop)"""
+    return await idf_doctor_async()
+
+def tool_pipeline(stages: str):
+    """Tool to read main.c, compile and run diagnostics in one step"""
+    return run_pipeline(stages)
+
+async def atool_pipeline(stages: str):
+    """Async variant of tool_pipeline"""
+    return await run_pipeline_async(stages)
+
 def make_agent():
     """Create and configure agent with available tools"""
+    # Deferred: importing LangChain dominates CLI start-up time
+    from langchain.agents import initialize_agent, Tool
+    from langchain.chat_models import ChatOpenAI
+    
     llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
     
     tools = [
+        Tool(
+            name="run_pipeline",
+            func=tool_pipeline,
+            coroutine=atool_pipeline,
+            description=(
+                "Prefer this for initial triage. Reads main/main.c, compiles and "
+                "runs idf.py doctor in a single step and returns a JSON object. "
+                "Input: stages to run, any of 'read,compile,doctor' (empty = all)"
+            )
+        ),
         Tool(
             name="compile",
             func=tool_compile,
+            coroutine=atool_compile,
             description="Compile the project with idf.py"
         ),
         Tool(
@@ -48,6 +78,7 @@ def make_agent():
         Tool(
             name="idf_doctor",
             func=tool_doctor,
+            coroutine=atool_doctor,
             description="Run idf.py doctor to diagnose environment"
         )
     ]
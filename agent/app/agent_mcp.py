@@ -5,10 +5,10 @@ This agent uses the MCP Server to interact with the ESP-IDF toolchain
 in a decoupled and scalable way.
 """
 
+import asyncio
 import os
 import sys
-from langchain.agents import initialize_agent, AgentType
-from langchain_community.chat_models import ChatOpenAI
+from functools import lru_cache
 
 # Add MCP server to path
 sys.path.insert(0, '/mcp-server/src')
@@ -16,34 +16,40 @@ sys.path.insert(0, '/mcp-server/src')
 from mcp_idf.client import MCPClient
 
 
-def create_agent():
+@lru_cache(maxsize=1)
+def _mcp_tools():
+    """MCP client and its LangChain tools (handshake + tool listing done once)"""
+    mcp_client = MCPClient()
+    return mcp_client, mcp_client.get_langchain_tools()
 
-import os
-import sys
-from langchain.agents import initialize_agent, AgentType
-from langchain.chat_models import ChatOpenAI
 
-# Add MCP server to path
-sys.path.insert(0, '/mcp-server/src')
-
-from mcp_idf.client import MCPClient
+@lru_cache(maxsize=1)
+def _llm():
+    """Shared chat model for all agents built in this process"""
+    from langchain_community.chat_models import ChatOpenAI
+    return ChatOpenAI(model="gpt-4o-mini", temperature=0)
 
 
 def create_agent():
     """Create agent with MCP tools."""
+    # Imported here: LangChain pulls in hundreds of modules and is only
+    # needed once an agent is actually built
+    from langchain.agents import initialize_agent, AgentType
     
-    # Initialize MCP client
-    mcp_client = MCPClient()
+    # MCP client and tools are reused across calls
+    _, tools = _mcp_tools()
     
-    # Get tools from MCP server
-    tools = mcp_client.get_langchain_tools()
-    
-    # Create LLM model
-    llm = ChatOpenAI(
+    # MCP tools take structured (multi-argument) input
+    return initialize_agent(
+        tools,
+        _llm(),
+        agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
+        verbose=True
+    )
 
 
-def main():
-    """Main entry point for the agent."""
+async def amain():
+    """Async entry point: tools run without blocking the event loop."""
     
     # Check API key
     if not os.getenv("OPENAI_API_KEY"):
@@ -64,15 +70,16 @@ def main():
         # Execute command from arguments
         query = " ".join(sys.argv[1:])
         print(f"Query: {query}\n")
-        result = agent.run(query)
-        print(f"\nResult:\n{result}")
+        result = await agent.ainvoke({"input": query})
+        print(f"\nResult:\n{result['output']}")
     else:
         # Interactive mode
         print("Interactive mode - Type 'exit' or 'quit' to exit\n")
         
         while True:
             try:
-                query = input("\n🤖 Query: ").strip()
+                # input() blocks, so read it off the event loop
+                query = (await asyncio.to_thread(input, "\n🤖 Query: ")).strip()
                 
                 if query.lower() in ['exit', 'quit', 'q']:
                     print("Goodbye!")
@@ -82,15 +89,28 @@ def main():
                     continue
                 
                 print()
-                result = agent.run(query)
-                print(f"\n✅ Result:\n{result}")
+                result = await agent.ainvoke({"input": query})
+                print(f"\n✅ Result:\n{result['output']}")
                 
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError):
                 print("\n\nGoodbye!")
                 break
             except Exception as e:
                 print(f"\n❌ Error: {str(e)}")
 
 
+def main():
+    """Main entry point for the agent."""
+    # uvloop (if installed) speeds up subprocess spawn and pipe I/O
+    try:
+        import uvloop
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        loop_factory = None
+    
+    with asyncio.Runner(loop_factory=loop_factory) as runner:
+        runner.run(amain())
+
+
 if __name__ == "__main__":
     main()
@@ -7,3 +7,4 @@ Este directorio contiene las herramientas que utiliza el agente para interactuar
 - **compile.py**: Compilación del proyecto con `idf.py build`
 - **edit_file.py**: Lectura y escritura de archivos en el workspace
 - **diagnose.py**: Diagnóstico del entorno con `idf.py doctor`
+- **pipeline.py**: Lectura + compilación + diagnóstico en una sola llamada
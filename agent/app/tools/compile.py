@@ -1,7 +1,51 @@
-import subprocess
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+
+BUILD_CMD = "idf.py set-target ${ESP_IDF_TARGET:-esp32} && idf.py build"
+
+# Only the end of the log and the first error lines are returned, so a
+# failing build does not flood the LLM context with megabytes of output
+TAIL_LINES = 400
+MAX_ERROR_LINES = 50
+
+async def run_build_async():
+    """Compile ESP-IDF project using idf.py build (non-blocking)"""
+    proc = await asyncio.create_subprocess_exec(
+        "bash", "-lc", BUILD_CMD,
+        cwd="/workspace",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        limit=1 << 20,
+    )
+    tail = deque(maxlen=TAIL_LINES)
+    errors = []
+    total = 0
+    async for raw in proc.stdout:
+        line = raw.decode(errors="replace").rstrip("\n")
+        total += 1
+        tail.append(line)
+        if len(errors) < MAX_ERROR_LINES and ("error:" in line or "FAILED" in line):
+            errors.append(line)
+    await proc.wait()
+
+    if total <= TAIL_LINES:
+        return "\n".join(tail)
+    output = f"... ({total - TAIL_LINES} earlier lines omitted)\n" + "\n".join(tail)
+    if errors:
+        output = "\n".join(errors) + "\n---\n" + output
+    return output
 
 def run_build():
-    """Compile ESP-IDF project using idf.py build"""
-    cmd = ["bash", "-lc", "idf.py set-target ${ESP_IDF_TARGET:-esp32} && idf.py build"]
-    p = subprocess.run(cmd, cwd="/workspace", capture_output=True, text=True)
-    return (p.stdout or "") + (p.stderr or "")
+    """Compile ESP-IDF project using idf.py build
+
+    Async callers should await run_build_async() instead. Inside a running
+    event loop (where asyncio.run is not allowed) the coroutine runs on
+    a worker thread with its own loop.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(run_build_async())
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(lambda: asyncio.run(run_build_async())).result()
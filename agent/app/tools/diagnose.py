@@ -1,6 +1,26 @@
-import subprocess
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+async def idf_doctor_async():
+    """Run idf.py doctor to diagnose ESP-IDF environment (non-blocking)"""
+    proc = await asyncio.create_subprocess_exec(
+        "bash", "-lc", "idf.py doctor",
+        cwd="/workspace",
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await proc.communicate()
+    return stdout.decode(errors="replace") + stderr.decode(errors="replace")
 
 def idf_doctor():
-    """Run idf.py doctor to diagnose ESP-IDF environment"""
-    p = subprocess.run(["bash", "-lc", "idf.py doctor"], cwd="/workspace", capture_output=True, text=True)
-    return (p.stdout or "") + (p.stderr or "")
+    """Run idf.py doctor to diagnose ESP-IDF environment
+
+    Async callers should await idf_doctor_async(); see run_build for how this
+    behaves when called from a running event loop.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(idf_doctor_async())
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(lambda: asyncio.run(idf_doctor_async())).result()
@@ -1,12 +1,75 @@
+import mmap
+import os
+import stat
+from collections import OrderedDict
 from pathlib import Path
 
+# path -> (mtime_ns, size, content); evicts least recently used entries
+_FILE_CACHE: "OrderedDict[str, tuple[int, int, str]]" = OrderedDict()
+_FILE_CACHE_MAX = 64
+
+# Files larger than this are read through mmap instead of os.read
+MMAP_THRESHOLD = 256 * 1024
+
+def _read_fd(fd: int, size: int) -> bytes:
+    if size > MMAP_THRESHOLD:
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            return bytes(mm)
+    chunks = []
+    while True:
+        chunk = os.read(fd, max(size, 1 << 16))
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
 def read_file(path: str):
-    """Read a file from workspace"""
+    """Read a file from workspace (served from cache while unchanged on disk)"""
     fp = Path("/workspace") / path
-    return fp.read_text(encoding="utf-8")
+    key = str(fp)
+    fd = os.open(fp, os.O_RDONLY)
+    try:
+        st = os.fstat(fd)
+        cached = _FILE_CACHE.get(key)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            _FILE_CACHE.move_to_end(key)
+            return cached[2]
+        content = _read_fd(fd, st.st_size).decode("utf-8")
+    finally:
+        os.close(fd)
+    _FILE_CACHE[key] = (st.st_mtime_ns, st.st_size, content)
+    _FILE_CACHE.move_to_end(key)
+    if len(_FILE_CACHE) > _FILE_CACHE_MAX:
+        _FILE_CACHE.popitem(last=False)
+    return content
+
+def write_file(path: str, content: str, durable: bool = False):
+    """Write content to a file in workspace (atomically, via temp file + rename)
 
-def write_file(path: str, content: str):
-    """Write content to a file in workspace"""
+    An existing file keeps its permission bits. durable=True also fsyncs
+    the data before the rename, so the edit survives a power loss.
+    """
     fp = Path("/workspace") / path
-    fp.write_text(content, encoding="utf-8")
+    _FILE_CACHE.pop(str(fp), None)
+    data = content.encode("utf-8")
+    try:
+        mode = stat.S_IMODE(os.stat(fp).st_mode)
+    except FileNotFoundError:
+        mode = None
+    tmp = fp.with_suffix(fp.suffix + ".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        try:
+            if mode is not None:
+                os.fchmod(fd, mode)
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            if durable:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp, fp)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
     return f"File written: {path} ({len(content)} bytes)"
@@ -0,0 +1,47 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+
+from tools.compile import run_build_async
+from tools.diagnose import idf_doctor_async
+from tools.edit_file import read_file
+
+STAGES = ("read", "compile", "doctor")
+
+async def run_pipeline_async(stages: str = ""):
+    """Run read/compile/doctor in one call (compile and doctor concurrently)
+
+    stages: any combination of "read", "compile", "doctor" (default: all)
+    Returns a JSON object with one key per executed stage.
+    """
+    requested = [s for s in STAGES if s in stages.lower()] or list(STAGES)
+    result = {}
+
+    if "read" in requested:
+        try:
+            result["main_c"] = read_file("main/main.c")
+        except OSError as e:
+            result["main_c"] = f"Error reading main/main.c: {e}"
+
+    jobs = {}
+    if "compile" in requested:
+        jobs["compile"] = run_build_async()
+    if "doctor" in requested:
+        jobs["doctor"] = idf_doctor_async()
+    outputs = await asyncio.gather(*jobs.values())
+    result.update(zip(jobs.keys(), outputs))
+
+    return json.dumps(result)
+
+def run_pipeline(stages: str = ""):
+    """Run read/compile/doctor in one call
+
+    Async callers should await run_pipeline_async(); see run_build for how this
+    behaves when called from a running event loop.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(run_pipeline_async(stages))
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(lambda: asyncio.run(run_pipeline_async(stages))).result()
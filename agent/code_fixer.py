@@ -3,16 +3,106 @@ Code analyzer and fixer using LLM
 Connects Developer Agent with LLM provider
 """
 
+import asyncio
+import hashlib
 import json
 import os
 import re
-from typing import Dict, List, Any, Optional, Tuple
-from agent.llm_provider import get_llm, LLMConfig, LLMProvider
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Any, Optional, Tuple
+
+try:
+    import orjson
+    _json_loads = orjson.loads  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    from xxhash import xxh3_64_intdigest as _hash64
+except ImportError:
+    # Stable across processes, unlike hash() on bytes (randomized per run)
+    def _hash64(data: bytes) -> int:
+        return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+from agent.llm_provider import LLMConfig, LLMProvider, get_llm
 from agent.prompts import (
     ESP32_DEVELOPER_SYSTEM_PROMPT,
+    get_batch_fix_prompt,
     get_fix_prompt,
     get_simple_fix_prompt,
 )
+from agent.workspace_state import WORKSPACE_DIR, WorkspaceState
+
+if TYPE_CHECKING:  # langchain is imported only when a fixer is created
+    from langchain_core.messages import SystemMessage
+
+# Fenced code block (```c, ```cpp or bare ```), compiled once per process
+_CODE_RE = re.compile(r'```(?:c|cpp)?\s*\n(.*?)\n```', re.DOTALL)
+
+# Cached fixes expire after 24h so model/prompt updates eventually take effect
+FIX_CACHE_TTL = 24 * 60 * 60
+
+# A diagnostics run is reused by fixes started within this many seconds
+DIAGNOSTICS_TTL = 5.0
+DIAGNOSTICS_MAX_CHARS = 4000
+
+# Minimum seconds between "Receiving fix..." progress updates while streaming
+STREAM_PROGRESS_INTERVAL = 0.2
+
+
+def _extract_json_block(text: str, open_ch: str = "{", close_ch: str = "}") -> Optional[str]:
+    """
+    Return the first balanced {...} (or [...]) block in text.
+    
+    Brackets inside JSON strings are ignored, so code in "fixed_code"
+    does not confuse the scan. Returns None if no balanced block exists.
+    """
+    start = text.find(open_ch)
+    if start < 0:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == open_ch:
+            depth += 1
+        elif ch == close_ch:
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+def _block_hashes(code: str) -> List[int]:
+    """Hash each blank-line separated block of code (indentation ignored)"""
+    hashes = []
+    block = []
+    for line in code.splitlines():
+        line = line.strip()
+        if line:
+            block.append(line)
+        elif block:
+            hashes.append(_hash64("\n".join(block).encode()))
+            block = []
+    if block:
+        hashes.append(_hash64("\n".join(block).encode()))
+    return hashes
 
 
 class CodeFixResult:
@@ -53,16 +143,60 @@ class ESP32CodeFixer:
     Analyzes ESP32 code errors and generates fixes using LLM
     """
     
-    def __init__(self, llm_config: Optional[LLMConfig] = None):
+    def __init__(
+        self,
+        llm_config: Optional[LLMConfig] = None,
+        diagnostics: Optional[Callable[[], str]] = None,
+        project_dir: str = WORKSPACE_DIR
+    ):
         """
         Initialize code fixer with LLM
         
         Args:
             llm_config: LLM configuration (None = use default Ollama)
+            diagnostics: Optional callable returning an environment report
+                (e.g. idf.py doctor). It is started in the background while
+                the LLM generates and used to retry low-confidence fixes.
+            project_dir: ESP-IDF project whose .agent/state.json is loaded;
+                state recorded for another project is ignored
         """
         self.llm_config = llm_config or LLMConfig()
         self.llm = None
+        self.diagnostics = diagnostics
+        # sha256(inputs) -> (stored_at, CodeFixResult)
+        self._fix_cache: Dict[str, Tuple[float, CodeFixResult]] = {}
+        self._diagnostics_run: Optional[Tuple[float, Future]] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # fix_code may run concurrently in worker threads (one per file);
+        # guards the diagnostics run and the workspace state updates
+        self._lock = threading.Lock()
+        # State is loaded once and frozen into the system prompt for the whole
+        # session, so the prompt prefix stays stable (provider prompt caching);
+        # updates are persisted to disk for the next session only
+        self._state_path = Path(project_dir) / ".agent" / "state.json"
+        self.workspace_state = WorkspaceState.load(self._state_path, project_dir=project_dir)
+        self.system_prompt = ESP32_DEVELOPER_SYSTEM_PROMPT + self.workspace_state.to_prompt()
         self._initialize_llm()
+        self.system_message = self._build_system_message()
+    
+    def _build_system_message(self) -> "SystemMessage":
+        """
+        Build the system message shared by every request.
+        
+        It is identical for all calls (per-call details go in the user
+        message), so providers can reuse the cached prompt prefix. Anthropic
+        only caches blocks explicitly marked with cache_control; the check
+        is on the LLM actually built, which is Ollama after a fallback.
+        """
+        from langchain_core.messages import SystemMessage
+        
+        if type(self.llm).__module__.startswith("langchain_anthropic"):
+            return SystemMessage(content=[{
+                "type": "text",
+                "text": self.system_prompt,
+                "cache_control": {"type": "ephemeral"},
+            }])
+        return SystemMessage(content=self.system_prompt)
     
     @property
     def model(self) -> str:
@@ -85,7 +219,8 @@ class ESP32CodeFixer:
         error_type: str = "compilation_error",
         filename: str = "main.c",
         component: str = "main",
-        use_simple_prompt: bool = False
+        use_simple_prompt: bool = False,
+        diagnostics_report: Optional[str] = None
     ) -> CodeFixResult:
         """
         Fix buggy ESP32 code using LLM
@@ -97,6 +232,8 @@ class ESP32CodeFixer:
             filename: Name of the file with error
             component: ESP-IDF component name
             use_simple_prompt: Use simple prompt for faster fixes
+            diagnostics_report: Environment report collected by the caller,
+                used instead of running the diagnostics callable
         
         Returns:
             CodeFixResult with fixed code and analysis
@@ -105,12 +242,23 @@ class ESP32CodeFixer:
         print(f"   File: {filename}")
         print(f"   Error: {error_message[:100]}...")
         
+        cache_key = self._fix_cache_key(
+            use_simple_prompt, error_type, filename, component, error_message, buggy_code
+        )
+        cached = self._get_cached_fix(cache_key)
+        if cached:
+            print("♻️  Reusing cached fix for identical input")
+            return cached
+        
         try:
             # Generate prompt
             if use_simple_prompt:
                 prompt = get_simple_fix_prompt(error_message, buggy_code)
-                return self._simple_fix(prompt, buggy_code)
+                result = self._simple_fix(prompt, buggy_code)
             else:
+                # Speculatively run diagnostics while the LLM is generating,
+                # unless the caller already collected a report
+                diagnostics = None if diagnostics_report else self._prefetch_diagnostics()
                 prompt = get_fix_prompt(
                     error_type=error_type,
                     error_message=error_message,
@@ -118,7 +266,35 @@ class ESP32CodeFixer:
                     filename=filename,
                     component=component
                 )
-                return self._structured_fix(prompt, buggy_code)
+                result = self._structured_fix(prompt, buggy_code)
+                
+                if result.success and result.confidence == "low":
+                    if diagnostics_report:
+                        report = diagnostics_report[-DIAGNOSTICS_MAX_CHARS:]
+                    else:
+                        report = diagnostics and self._diagnostics_report(diagnostics)
+                    if report:
+                        with self._lock:
+                            self.workspace_state.last_doctor = report
+                        print("🏥 Low confidence fix, retrying with environment diagnostics")
+                        prompt = get_fix_prompt(
+                            error_type=error_type,
+                            error_message=(
+                                f"{error_message}\n\n"
+                                f"Environment diagnostics (idf.py doctor):\n{report}"
+                            ),
+                            code=buggy_code,
+                            filename=filename,
+                            component=component
+                        )
+                        retry = self._structured_fix(prompt, buggy_code)
+                        if retry.success:
+                            result = retry
+            
+            if result.success:
+                self._fix_cache[cache_key] = (time.monotonic(), result)
+                self._record_fix(error_message, filename, result)
+            return result
         
         except Exception as e:
             print(f"❌ Fix failed: {e}")
@@ -128,20 +304,94 @@ class ESP32CodeFixer:
                 error=str(e)
             )
     
+    def _prefetch_diagnostics(self) -> Optional[Future]:
+        """Start a background diagnostics run, or reuse a recent one"""
+        if self.diagnostics is None:
+            return None
+        
+        with self._lock:
+            now = time.monotonic()
+            if self._diagnostics_run and now - self._diagnostics_run[0] < DIAGNOSTICS_TTL:
+                return self._diagnostics_run[1]
+            
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="diagnostics")
+            future = self._executor.submit(self.diagnostics)
+            self._diagnostics_run = (now, future)
+            return future
+    
+    @staticmethod
+    def _diagnostics_report(future: Future) -> Optional[str]:
+        """Wait for a prefetched diagnostics run and return its (trimmed) output"""
+        try:
+            report = str(future.result())
+        except Exception as e:
+            print(f"⚠️  Diagnostics failed: {e}")
+            return None
+        return report[-DIAGNOSTICS_MAX_CHARS:]
+    
+    def _record_fix(self, error_message: str, filename: str, result: CodeFixResult):
+        """Persist the latest error/fix to the workspace state file"""
+        state = self.workspace_state
+        with self._lock:
+            state.last_error = error_message
+            state.last_fix_diagnosis = result.diagnosis or ""
+            if result.fixed_code:
+                state.file_hashes[filename] = hashlib.sha256(result.fixed_code.encode()).hexdigest()
+            try:
+                state.save(self._state_path)
+            except OSError as e:
+                print(f"⚠️  Could not save workspace state: {e}")
+    
+    @staticmethod
+    def _fix_cache_key(*parts: Any) -> str:
+        """Content hash of the inputs that determine a fix"""
+        return hashlib.sha256("|".join(str(p) for p in parts).encode()).hexdigest()
+    
+    def _get_cached_fix(self, cache_key: str) -> Optional[CodeFixResult]:
+        """Return a cached fix if present and not expired"""
+        cached = self._fix_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < FIX_CACHE_TTL:
+            return cached[1]
+        return None
+    
     def _simple_fix(self, prompt: str, original_code: str) -> CodeFixResult:
         """
         Simple fix - just return the fixed code
         """
         # Use system prompt + user prompt
         messages = [
-            ("system", ESP32_DEVELOPER_SYSTEM_PROMPT),
+            self.system_message,
             ("user", prompt)
         ]
         
-        response = self.llm.invoke(messages)
-        # Handle both string and object responses
-        response_text = str(response.content) if hasattr(response, 'content') else str(response)
-        fixed_code = self._extract_code_from_response(response_text)
+        # Stream the response and stop as soon as the code block is closed;
+        # trailing explanation after the fence is never waited for
+        chunks = []
+        received = 0
+        fences = 0
+        # Up to 2 trailing chars not part of a counted fence, so a fence
+        # split across chunks is still found (without rescanning the buffer)
+        tail = ""
+        next_progress = 0.0
+        for chunk in self.llm.stream(messages):
+            # Handle both string and message-chunk responses
+            text = str(chunk.content) if hasattr(chunk, 'content') else str(chunk)
+            chunks.append(text)
+            received += len(text)
+            window = tail + text
+            if "`" in text:
+                fences += window.count("```")
+                if fences >= 2:
+                    break
+                window = window[window.rfind("```") + 3:] if "```" in window else window
+            tail = window[-2:]
+            now = time.monotonic()
+            if now >= next_progress:
+                print(f"\r   ✍️  Receiving fix... {received} chars", end="", flush=True)
+                next_progress = now + STREAM_PROGRESS_INTERVAL
+        print(f"\r   ✍️  Receiving fix... {received} chars")
+        fixed_code = self._extract_code_from_response("".join(chunks))
         
         if fixed_code and fixed_code != original_code:
             print("✅ Code fixed successfully (simple mode)")
@@ -166,7 +416,7 @@ class ESP32CodeFixer:
         """
         # Use system prompt + user prompt
         messages = [
-            ("system", ESP32_DEVELOPER_SYSTEM_PROMPT),
+            self.system_message,
             ("user", prompt)
         ]
         
@@ -177,18 +427,10 @@ class ESP32CodeFixer:
         # Try to parse JSON response
         try:
             # Extract JSON from response (might be wrapped in markdown code blocks)
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                fix_data = json.loads(json_match.group(0))
-                
-                return CodeFixResult(
-                    success=True,
-                    original_code=original_code,
-                    fixed_code=fix_data.get("fixed_code"),
-                    diagnosis=fix_data.get("diagnosis"),
-                    changes_made=fix_data.get("changes_made", []),
-                    confidence=fix_data.get("confidence", "unknown")
-                )
+            json_block = _extract_json_block(response_text)
+            if json_block:
+                fix_data = _json_loads(json_block)
+                return self._result_from_fix_data(fix_data, original_code)
             else:
                 # Fallback: treat whole response as fixed code
                 fixed_code = self._extract_code_from_response(response_text)
@@ -211,39 +453,81 @@ class ESP32CodeFixer:
                 confidence="low"
             )
     
+    @staticmethod
+    def _result_from_fix_data(fix_data: Dict[str, Any], original_code: str) -> CodeFixResult:
+        """Build a CodeFixResult from a parsed JSON fix object"""
+        return CodeFixResult(
+            success=True,
+            original_code=original_code,
+            fixed_code=fix_data.get("fixed_code"),
+            diagnosis=fix_data.get("diagnosis"),
+            changes_made=fix_data.get("changes_made", []),
+            confidence=fix_data.get("confidence", "unknown")
+        )
+    
+    async def _batch_structured_fix(
+        self,
+        prompts: List[str],
+        originals: List[str]
+    ) -> List[CodeFixResult]:
+        """
+        Structured fix for several cases with a single LLM request.
+        
+        Falls back to one request per case if the response is not a JSON
+        array with one object per case.
+        """
+        messages = [
+            self.system_message,
+            ("user", get_batch_fix_prompt(prompts))
+        ]
+        
+        try:
+            response = await self.llm.ainvoke(messages)
+            response_text = str(response.content) if hasattr(response, 'content') else str(response)
+            json_block = _extract_json_block(response_text, "[", "]")
+            fixes = _json_loads(json_block) if json_block else None
+            if (
+                isinstance(fixes, list)
+                and len(fixes) == len(prompts)
+                and all(isinstance(f, dict) for f in fixes)
+            ):
+                return [
+                    self._result_from_fix_data(fix_data, original)
+                    for fix_data, original in zip(fixes, originals)
+                ]
+            print(f"⚠️  Batch response not usable, fixing {len(prompts)} cases individually")
+        except Exception as e:
+            print(f"⚠️  Batch fix failed ({e}), fixing {len(prompts)} cases individually")
+        
+        results = await asyncio.gather(*(
+            asyncio.to_thread(self._structured_fix, prompt, original)
+            for prompt, original in zip(prompts, originals)
+        ), return_exceptions=True)
+        return [
+            CodeFixResult(success=False, original_code=original, error=str(result))
+            if isinstance(result, Exception) else result
+            for result, original in zip(results, originals)
+        ]
+    
     def _extract_code_from_response(self, response: str) -> Optional[str]:
         """
         Extract C code from LLM response (handles markdown code blocks)
         """
         # Try to extract code from markdown code blocks
-        code_patterns = [
-            r'```c\n(.*?)\n```',      # ```c ... ```
-            r'```cpp\n(.*?)\n```',    # ```cpp ... ```
-            r'```\n(.*?)\n```',       # ``` ... ```
-        ]
-        
-        for pattern in code_patterns:
-            match = re.search(pattern, response, re.DOTALL)
+        if "```" in response:
+            match = _CODE_RE.search(response)
             if match:
                 return match.group(1).strip()
         
-        # If no code blocks, check if response looks like C code
-        if '#include' in response or 'void app_main' in response:
-            # Clean up the response
-            lines = response.split('\n')
-            code_lines = []
-            in_code = False
-            
-            for line in lines:
-                if '#include' in line or 'void ' in line:
-                    in_code = True
-                if in_code:
-                    code_lines.append(line)
-            
-            if code_lines:
-                return '\n'.join(code_lines).strip()
-        
-        return None
+        # If no code blocks, take everything from the first line that looks
+        # like C code (#include, else app_main) to the end of the response
+        start = response.find('#include')
+        if start < 0:
+            start = response.find('void app_main')
+            if start < 0:
+                return None
+        start = response.rfind('\n', 0, start) + 1
+        return response[start:].strip() or None
     
     def batch_fix(
         self,
@@ -252,37 +536,139 @@ class ESP32CodeFixer:
         """
         Fix multiple test cases
         
+        Runs abatch_fix in a new event loop. When called from code that is
+        already inside a running loop (where asyncio.run would fail), cases
+        are fixed one request at a time instead; async callers should
+        await abatch_fix to keep batching.
+        
         Args:
             test_cases: List of test case dictionaries
         
         Returns:
             List of (test_name, CodeFixResult) tuples
         """
-        results = []
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.abatch_fix(test_cases))
         
-        for i, test_case in enumerate(test_cases, 1):
-            print(f"\n{'='*70}")
-            print(f"Test {i}/{len(test_cases)}: {test_case['name']}")
-            print(f"{'='*70}")
+        print("⚠️  Event loop already running, fixing cases one at a time (await abatch_fix to batch)")
+        fixes, pending = self._plan_batch(test_cases)
+        for i, cache_key, prompt, code in pending:
+            try:
+                result = self._structured_fix(prompt, code)
+            except Exception as e:
+                result = CodeFixResult(success=False, original_code=code, error=str(e))
+            self._store_batch_fix(fixes, i, cache_key, result)
+        return self._report_batch(test_cases, fixes)
+    
+    async def abatch_fix(
+        self,
+        test_cases: List[Dict[str, Any]]
+    ) -> List[Tuple[str, CodeFixResult]]:
+        """
+        Fix multiple test cases (async)
+        
+        Cases are grouped into batches of LLM_BATCH_SIZE (default 4) that
+        are each sent as a single LLM request; batches run concurrently.
+        
+        Args:
+            test_cases: List of test case dictionaries
+        
+        Returns:
+            List of (test_name, CodeFixResult) tuples
+        """
+        batch_size = max(1, int(os.getenv("LLM_BATCH_SIZE", "4")))
+        fixes, pending = self._plan_batch(test_cases)
+        
+        if pending:
+            groups = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+            print(f"\n📦 Fixing {len(pending)} cases in {len(groups)} batched LLM requests")
             
-            result = self.fix_code(
-                buggy_code=test_case['buggy_code'],
-                error_message=test_case.get('expected_error', 'Unknown error'),
-                error_type=test_case.get('error_type', 'compilation_error'),
-                filename=f"{test_case['name']}.c"
+            all_results = await asyncio.gather(*(
+                self._batch_structured_fix(
+                    [prompt for _, _, prompt, _ in group],
+                    [code for _, _, _, code in group]
+                )
+                for group in groups
+            ))
+            for group, group_results in zip(groups, all_results):
+                for (i, cache_key, _, _), result in zip(group, group_results):
+                    self._store_batch_fix(fixes, i, cache_key, result)
+        
+        return self._report_batch(test_cases, fixes)
+    
+    def _plan_batch(
+        self,
+        test_cases: List[Dict[str, Any]]
+    ) -> Tuple[List[Optional[CodeFixResult]], List[Tuple[int, str, str, str]]]:
+        """Split test cases into cached fixes and pending (index, cache_key, prompt, code)"""
+        fixes: List[Optional[CodeFixResult]] = [None] * len(test_cases)
+        pending: List[Tuple[int, str, str, str]] = []
+        
+        for i, test_case in enumerate(test_cases):
+            error_message = test_case.get('expected_error', 'Unknown error')
+            error_type = test_case.get('error_type', 'compilation_error')
+            filename = f"{test_case['name']}.c"
+            cache_key = self._fix_cache_key(
+                False, error_type, filename, "main", error_message, test_case['buggy_code']
             )
-            
+            fixes[i] = self._get_cached_fix(cache_key)
+            if fixes[i] is None:
+                prompt = get_fix_prompt(
+                    error_type=error_type,
+                    error_message=error_message,
+                    code=test_case['buggy_code'],
+                    filename=filename
+                )
+                pending.append((i, cache_key, prompt, test_case['buggy_code']))
+        return fixes, pending
+    
+    def _store_batch_fix(
+        self,
+        fixes: List[Optional[CodeFixResult]],
+        index: int,
+        cache_key: str,
+        result: CodeFixResult
+    ):
+        """Record a batch result (and cache it if successful)"""
+        fixes[index] = result
+        if result.success:
+            self._fix_cache[cache_key] = (time.monotonic(), result)
+    
+    @staticmethod
+    def _report_batch(
+        test_cases: List[Dict[str, Any]],
+        fixes: List[Optional[CodeFixResult]]
+    ) -> List[Tuple[str, CodeFixResult]]:
+        """Print a summary per case and pair results with test names"""
+        results = []
+        total = len(test_cases)
+        
+        # Each case summary is built up front and written in one call,
+        # instead of ~6 print() flushes per case on a piped stdout
+        for i, (test_case, result) in enumerate(zip(test_cases, fixes), 1):
             results.append((test_case['name'], result))
             
+            lines = [
+                f"\n{'='*70}",
+                f"Test {i}/{total}: {test_case['name']}",
+                f"{'='*70}",
+            ]
+            
             # Show result summary
             if result.success:
-                print(f"✅ FIXED - Confidence: {result.confidence}")
+                lines.append(f"✅ FIXED - Confidence: {result.confidence}")
                 if result.diagnosis:
-                    print(f"   Diagnosis: {result.diagnosis}")
+                    lines.append(f"   Diagnosis: {result.diagnosis}")
                 if result.changes_made:
-                    print(f"   Changes: {', '.join(result.changes_made[:3])}")
+                    lines.append(f"   Changes: {', '.join(result.changes_made[:3])}")
             else:
-                print(f"❌ FAILED - {result.error}")
+                lines.append(f"❌ FAILED - {result.error}")
+            
+            lines.append("")
+            sys.stdout.write("\n".join(lines))
+        sys.stdout.flush()
         
         return results
     
@@ -301,7 +687,10 @@ class ESP32CodeFixer:
             expected_code: Expected correct code (optional)
         
         Returns:
-            Validation results
+            Validation results. similarity_score is the Jaccard index of
+            the stripped, non-blank lines of fixed and expected code
+            (shared / union), so lines the fix adds also lower it; it was
+            previously the fraction of expected lines found in the fix.
         """
         validation = {
             "code_changed": fixed_code != original_code,
@@ -312,15 +701,19 @@ class ESP32CodeFixer:
         }
         
         if expected_code:
-            # Simple similarity check
-            fixed_lines = set(fixed_code.strip().split('\n'))
-            expected_lines = set(expected_code.strip().split('\n'))
+            # Identical block hashes (same blocks, same order) is a match;
+            # this rejects/accepts without any line-level comparison
+            if fixed_code == expected_code or _block_hashes(fixed_code) == _block_hashes(expected_code):
+                validation["matches_expected"] = True
+                validation["similarity_score"] = 1.0
+                return validation
             
-            common_lines = fixed_lines & expected_lines
-            total_lines = len(expected_lines)
+            # Jaccard similarity over non-blank lines, ignoring indentation
+            fixed_lines = frozenset(filter(None, map(str.strip, fixed_code.splitlines())))
+            expected_lines = frozenset(filter(None, map(str.strip, expected_code.splitlines())))
+            union = len(fixed_lines | expected_lines)
             
-            validation["matches_expected"] = fixed_lines == expected_lines
-            validation["similarity_score"] = len(common_lines) / total_lines if total_lines > 0 else 0.0
+            validation["similarity_score"] = len(fixed_lines & expected_lines) / union if union else 0.0
         
         return validation
 
@@ -341,12 +734,25 @@ def _env_flag(var: str, default: bool) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
-def create_code_fixer(
-    provider: Optional[str] = None,
-    model: Optional[str] = None
-) -> ESP32CodeFixer:
-    """Factory function that builds the LLM config using .env overrides."""
+def _env_int(var: str) -> Optional[int]:
+    value = os.getenv(var)
+    if not value:
+        return None
+    try:
+        return int(value.strip())
+    except ValueError:
+        print(f"⚠️  Ignoring non-integer {var}={value!r}")
+        return None
+
 
+@lru_cache(maxsize=16)
+def _build_config(provider: Optional[str], model: Optional[str]) -> LLMConfig:
+    """
+    Resolve the LLM config for (provider, model) using .env overrides.
+    
+    Environment variables are read once per key; the returned config is
+    shared between fixers and must not be modified.
+    """
     provider_name = provider or os.getenv("LLM_PROVIDER", LLMProvider.OLLAMA.value)
     provider_enum = LLMProvider(provider_name.lower())
 
@@ -360,19 +766,24 @@ def create_code_fixer(
     elif provider_enum == LLMProvider.DEEPSEEK:
         base_url = os.getenv("DEEPSEEK_BASE_URL")
 
-    max_tokens_env = os.getenv("LLM_MAX_TOKENS")
-    max_tokens = int(max_tokens_env) if max_tokens_env and max_tokens_env.isdigit() else None
-
-    config = LLMConfig(
+    return LLMConfig(
         provider=provider_enum,
         model=resolved_model,
         temperature=float(os.getenv("LLM_TEMPERATURE", "0.1")),
-        max_tokens=max_tokens,
+        max_tokens=_env_int("LLM_MAX_TOKENS"),
         base_url=base_url,
         fallback_to_local=_env_flag("LLM_FALLBACK_TO_LOCAL", True),
     )
-    
-    return ESP32CodeFixer(config)
+
+
+def create_code_fixer(
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
+    diagnostics: Optional[Callable[[], str]] = None,
+    project_dir: str = WORKSPACE_DIR
+) -> ESP32CodeFixer:
+    """Factory function that builds the LLM config using .env overrides."""
+    return ESP32CodeFixer(_build_config(provider, model), diagnostics=diagnostics, project_dir=project_dir)
 
 
 if __name__ == "__main__":
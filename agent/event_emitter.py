@@ -5,44 +5,103 @@ components (orchestrator, agents, etc.) to emit events that are captured
 by the web server and broadcast to connected clients.
 """
 import asyncio
+import os
+import threading
+import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any, List, Callable, Optional
-from enum import Enum
+from functools import lru_cache
+from typing import Dict, Any, Deque, List, Callable, Optional, Set, Tuple
+from enum import IntEnum
 import json
 
+try:
+    from .logger import get_logger
+except ImportError:  # imported as a top-level module (agent/ on sys.path)
+    from logger import get_logger
 
-class EventType(str, Enum):
-    """Event types for the system."""
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:
+        # NON_STR_KEYS: json.dumps accepts int/float/bool/None keys too
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:  # e.g. ints beyond 64 bits; json.dumps handles them
+            return json.dumps(obj)
+except ImportError:
+    _json_dumps = json.dumps
+
+logger = get_logger(__name__)
+
+# Maximum number of undelivered events kept in memory
+EVENT_QUEUE_MAXSIZE = int(os.getenv("EVENT_QUEUE_MAXSIZE", "10000"))
+
+# Maximum number of dispatched Event objects kept for reuse
+EVENT_POOL_SIZE = 1024
+
+# Maximum number of queued events dispatched per wake-up of the processing loop
+EVENT_BATCH_SIZE = 256
+
+# Maximum number of events waiting for one async listener; beyond that the
+# listener's oldest pending event is discarded (counted in `dropped`)
+LISTENER_QUEUE_MAXSIZE = 1024
+
+
+class EventType(IntEnum):
+    """Event types for the system.
+    
+    Integer-valued so listener lookups hash and compare ints; the wire name
+    sent to clients is the lowercase member name (see EVENT_TYPE_NAMES).
+    """
     # Agent events
-    AGENT_STATUS_CHANGED = "agent_status_changed"
-    AGENT_STARTED = "agent_started"
-    AGENT_STOPPED = "agent_stopped"
+    AGENT_STATUS_CHANGED = 1
+    AGENT_STARTED = 2
+    AGENT_STOPPED = 3
     
     # Job events
-    JOB_CREATED = "job_created"
-    JOB_STARTED = "job_started"
-    JOB_PROGRESS = "job_progress"
-    JOB_COMPLETED = "job_completed"
-    JOB_FAILED = "job_failed"
-    JOB_CANCELLED = "job_cancelled"
+    JOB_CREATED = 10
+    JOB_STARTED = 11
+    JOB_PROGRESS = 12
+    JOB_COMPLETED = 13
+    JOB_FAILED = 14
+    JOB_CANCELLED = 15
     
     # Workflow events
-    WORKFLOW_PHASE_STARTED = "workflow_phase_started"
-    WORKFLOW_PHASE_COMPLETED = "workflow_phase_completed"
+    WORKFLOW_PHASE_STARTED = 20
+    WORKFLOW_PHASE_COMPLETED = 21
     
     # Log events
-    LOG_ENTRY = "log_entry"
+    LOG_ENTRY = 30
     
     # Metric events
-    METRIC_UPDATE = "metric_update"
+    METRIC_UPDATE = 40
     
     # System events
-    SYSTEM_STATUS = "system_status"
+    SYSTEM_STATUS = 50
+
+
+# Wire format names, e.g. EventType.LOG_ENTRY -> "log_entry"
+EVENT_TYPE_NAMES: Dict[EventType, str] = {t: t.name.lower() for t in EventType}
+
+
+@lru_cache(maxsize=64)
+def _second_to_iso(second: int) -> str:
+    """ISO-8601 UTC string for a whole second (cached; events cluster in time)."""
+    return datetime.utcfromtimestamp(second).isoformat()
+
+
+def _ns_to_iso(timestamp_ns: int) -> str:
+    """ISO-8601 UTC string with microseconds for a time.time_ns() value."""
+    second, remainder = divmod(timestamp_ns, 1_000_000_000)
+    return f"{_second_to_iso(second)}.{remainder // 1000:06d}"
 
 
 class Event:
     """Event data structure."""
     
+    __slots__ = ("event_type", "data", "agent_id", "job_id", "timestamp_ns", "_pooled", "_refs")
+    
     def __init__(
         self,
         event_type: EventType,
@@ -50,64 +109,159 @@ class Event:
         agent_id: Optional[str] = None,
         job_id: Optional[int] = None
     ):
+        self.reset(event_type, data, agent_id, job_id)
+        self._pooled = False
+    
+    def reset(
+        self,
+        event_type: EventType,
+        data: Dict[str, Any],
+        agent_id: Optional[str] = None,
+        job_id: Optional[int] = None
+    ):
+        """(Re)initialize the event fields."""
         self.event_type = event_type
         self.data = data
         self.agent_id = agent_id
         self.job_id = job_id
-        self.timestamp = datetime.utcnow()
+        self.timestamp_ns = time.time_ns()
+        # Async listeners still holding the event (see EventEmitter._unref)
+        self._refs = 0
+    
+    @property
+    def timestamp(self) -> datetime:
+        """Event creation time (naive UTC datetime)."""
+        return datetime.utcfromtimestamp(self.timestamp_ns / 1e9)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert event to dictionary."""
         return {
-            "event_type": self.event_type.value,
+            "event_type": EVENT_TYPE_NAMES[self.event_type],
             "data": self.data,
             "agent_id": self.agent_id,
             "job_id": self.job_id,
-            "timestamp": self.timestamp.isoformat()
+            "timestamp": _ns_to_iso(self.timestamp_ns)
         }
     
     def to_json(self) -> str:
         """Convert event to JSON string."""
-        return json.dumps(self.to_dict())
+        return _json_dumps(self.to_dict())
 
 
 class EventEmitter:
     """Centralized event emitter for the system."""
     
     _instance = None
-    _lock = asyncio.Lock()
     
     def __new__(cls):
         """Singleton pattern to ensure only one event emitter exists."""
         if cls._instance is None:
             cls._instance = super(EventEmitter, cls).__new__(cls)
-            cls._instance._initialized = False
+            cls._instance._setup()
         return cls._instance
     
-    def __init__(self):
-        """Initialize event emitter."""
-        if self._initialized:
-            return
-        
+    def _setup(self):
+        """Initialize event emitter state (for the singleton, and again in
+        forked child processes, which must not reuse the parent's loop,
+        queue or listeners)."""
         self._listeners: Dict[EventType, List[Callable]] = {}
-        self._event_queue = asyncio.Queue()
+        # Event types with at least one listener; others are never queued
+        self._has_listeners: Set[EventType] = set()
+        # Immutable (is_coroutine, callback) snapshots, rebuilt in on/off
+        self._listener_cache: Dict[EventType, Tuple[Tuple[bool, Callable], ...]] = {}
+        self._event_queue = asyncio.Queue(maxsize=EVENT_QUEUE_MAXSIZE)
+        self._dropped = 0
+        # Recycled Event objects; only events created by the emitter itself
+        # and delivered to async listeners alone are returned here, once
+        # every listener has returned (a sync listener may keep a reference)
+        self._pool: Deque[Event] = deque(maxlen=EVENT_POOL_SIZE)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        # One (queue, worker task) per async listener, started on first use
+        self._listener_workers: Dict[Callable, Tuple[asyncio.Queue, asyncio.Task]] = {}
         self._running = False
-        self._initialized = True
     
     def on(self, event_type: EventType, callback: Callable):
         """Register an event listener."""
         if event_type not in self._listeners:
             self._listeners[event_type] = []
         self._listeners[event_type].append(callback)
+        self._has_listeners.add(event_type)
+        self._rebuild_listener_cache(event_type)
     
     def off(self, event_type: EventType, callback: Callable):
         """Unregister an event listener."""
         if event_type in self._listeners:
             self._listeners[event_type].remove(callback)
+            if not self._listeners[event_type]:
+                self._has_listeners.discard(event_type)
+            self._rebuild_listener_cache(event_type)
+            if not any(callback in callbacks for callbacks in self._listeners.values()):
+                worker = self._listener_workers.pop(callback, None)
+                if worker is not None:
+                    worker[1].cancel()
+    
+    def _rebuild_listener_cache(self, event_type: EventType):
+        """Snapshot listeners of a type, classifying coroutine functions once."""
+        self._listener_cache[event_type] = tuple(
+            (asyncio.iscoroutinefunction(callback), callback)
+            for callback in self._listeners[event_type]
+        )
     
     async def emit(self, event: Event):
-        """Emit an event to all registered listeners."""
-        await self._event_queue.put(event)
+        """Emit an event to all registered listeners (see emit_nowait)."""
+        self.emit_nowait(event)
+    
+    def emit_nowait(self, event: Event):
+        """Emit an event to all registered listeners, from sync or async code.
+        
+        Never blocks. Events nobody listens to are dropped instead of queued.
+        When the queue is full (listeners lagging or the processing loop not
+        started), the oldest queued event is discarded to make room, so
+        memory stays bounded; discarded events are counted in `dropped`.
+        """
+        if event.event_type in self._has_listeners:
+            self._enqueue(event)
+    
+    def _enqueue(self, event: Event):
+        """Queue an event, discarding the oldest one if the queue is full."""
+        try:
+            self._event_queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._event_queue.get_nowait()
+            self._dropped += 1
+            self._event_queue.put_nowait(event)
+    
+    @property
+    def dropped(self) -> int:
+        """Number of events discarded because the queue (or a listener's) was full."""
+        return self._dropped
+    
+    async def emit_async(self, event: Event):
+        """Emit an event, waiting for room instead of dropping when full."""
+        if event.event_type not in self._has_listeners:
+            return
+        try:
+            self._event_queue.put_nowait(event)
+        except asyncio.QueueFull:
+            await self._event_queue.put(event)
+    
+    def _acquire(
+        self,
+        event_type: EventType,
+        data: Dict[str, Any],
+        agent_id: Optional[str],
+        job_id: Optional[int]
+    ) -> Event:
+        """Take an Event from the pool (or allocate one) and initialize it."""
+        try:
+            event = self._pool.pop()
+        except IndexError:
+            event = Event.__new__(Event)
+        event.reset(event_type, data, agent_id, job_id)
+        event._pooled = True
+        return event
     
     async def emit_sync(
         self,
@@ -117,8 +271,8 @@ class EventEmitter:
         job_id: Optional[int] = None
     ):
         """Emit an event synchronously (helper method)."""
-        event = Event(event_type, data, agent_id, job_id)
-        await self.emit(event)
+        if event_type in self._has_listeners:
+            self._enqueue(self._acquire(event_type, data, agent_id, job_id))
     
     def emit_blocking(
         self,
@@ -127,58 +281,228 @@ class EventEmitter:
         agent_id: Optional[str] = None,
         job_id: Optional[int] = None
     ):
-        """Emit an event from synchronous code."""
-        event = Event(event_type, data, agent_id, job_id)
+        """Emit an event from synchronous code, in any thread.
+        
+        From a thread other than the one running the processing loop, the
+        event is handed over with call_soon_threadsafe; no task is created
+        and no event loop is looked up or created.
+        """
+        if event_type not in self._has_listeners:
+            return
+        event = self._acquire(event_type, data, agent_id, job_id)
+        loop = self._loop
+        if loop is not None and threading.get_ident() != self._loop_thread and loop.is_running():
+            loop.call_soon_threadsafe(self.emit_nowait, event)
+        else:
+            self.emit_nowait(event)
+    
+    def _release(self, event: Event):
+        """Return an emitter-created event to the pool."""
+        if event._pooled:
+            event.data = None  # drop payload reference
+            self._pool.append(event)
+    
+    def _dispatch(self, event: Event):
+        """Call all registered listeners for an event.
+        
+        Sync listeners run inline. Each async listener has its own worker
+        task fed by a queue, so a slow one (e.g. a stalled WebSocket) does
+        not hold up the drain or the other listeners, while every listener
+        still receives events one at a time, in emission order.
+        """
+        callbacks = self._listener_cache.get(event.event_type)
+        coroutines = []
+        if callbacks:
+            for is_coroutine, callback in callbacks:
+                if is_coroutine:
+                    coroutines.append(callback)
+                    continue
+                # The listener may keep the event: never recycle it
+                event._pooled = False
+                try:
+                    callback(event)
+                except Exception as e:
+                    logger.error("Error in event listener: %s", e)
+        
+        if not coroutines:
+            self._release(event)
+            return
+        
+        event._refs = len(coroutines)
+        for callback in coroutines:
+            self._deliver(callback, event)
+    
+    def _deliver(self, callback: Callable, event: Event):
+        """Queue an event for an async listener, dropping its oldest if full."""
+        worker = self._listener_workers.get(callback)
+        if worker is None:
+            queue = asyncio.Queue(maxsize=LISTENER_QUEUE_MAXSIZE)
+            task = asyncio.create_task(self._run_listener(callback, queue))
+            worker = self._listener_workers[callback] = (queue, task)
+        queue = worker[0]
         try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                asyncio.create_task(self.emit(event))
-            else:
-                loop.run_until_complete(self.emit(event))
-        except RuntimeError:
-            # No event loop, create a new one
-            asyncio.run(self.emit(event))
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._unref(queue.get_nowait())
+            self._dropped += 1
+            queue.put_nowait(event)
     
-    async def _process_events(self):
-        """Process events from the queue."""
-        while self._running:
+    async def _run_listener(self, callback: Callable, queue: asyncio.Queue):
+        """Await an async listener on its queued events, one at a time."""
+        while True:
+            event = await queue.get()
             try:
-                event = await asyncio.wait_for(
-                    self._event_queue.get(),
-                    timeout=1.0
-                )
+                await callback(event)
+            except Exception as e:
+                logger.error("Error in event listener: %s", e)
+            finally:
+                self._unref(event)
+    
+    def _unref(self, event: Event):
+        """Drop one async listener's hold on an event; recycle it after the last."""
+        event._refs -= 1
+        if not event._refs:
+            self._release(event)
+    
+    async def _process_events(self):
+        """Process events from the queue.
+        
+        Waits for one event, then drains up to EVENT_BATCH_SIZE already
+        queued events without suspending. Sleeps until an event or stop()
+        arrives instead of polling.
+        """
+        # Bound once: this loop runs for every event in the process
+        queue_get = self._event_queue.get
+        queue_get_nowait = self._event_queue.get_nowait
+        dispatch = self._dispatch
+        ensure_future = asyncio.ensure_future
+        wait = asyncio.wait
+        first_completed = asyncio.FIRST_COMPLETED
+        queue_empty = asyncio.QueueEmpty
+        
+        stop = ensure_future(self._stop_event.wait())
+        try:
+            while self._running:
+                get = ensure_future(queue_get())
+                await wait({get, stop}, return_when=first_completed)
+                if not get.done():
+                    get.cancel()
+                    break
                 
-                # Call all registered listeners for this event type
-                if event.event_type in self._listeners:
-                    for callback in self._listeners[event.event_type]:
-                        try:
-                            if asyncio.iscoroutinefunction(callback):
-                                await callback(event)
-                            else:
-                                callback(event)
-                        except Exception as e:
-                            print(f"Error in event listener: {e}")
+                batch = [get.result()]
+                for _ in range(EVENT_BATCH_SIZE - 1):
+                    try:
+                        batch.append(queue_get_nowait())
+                    except queue_empty:
+                        break
                 
-            except asyncio.TimeoutError:
-                continue
-            except Exception as e:
-                print(f"Error processing event: {e}")
+                for event in batch:
+                    try:
+                        dispatch(event)
+                    except Exception as e:
+                        logger.error("Error processing event: %s", e)
+        finally:
+            stop.cancel()
     
     async def start(self):
         """Start the event processing loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not None and self._loop is not loop:
+            # The queue may be bound to a previous loop (e.g. an earlier
+            # asyncio.run); move pending events to a fresh one
+            pending = self._event_queue
+            self._event_queue = asyncio.Queue(maxsize=EVENT_QUEUE_MAXSIZE)
+            while not pending.empty():
+                self._event_queue.put_nowait(pending.get_nowait())
+            # Workers of the previous loop are gone with it
+            self._listener_workers = {}
         self._running = True
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self._stop_event = asyncio.Event()
         asyncio.create_task(self._process_events())
     
     async def stop(self):
         """Stop the event processing loop."""
         self._running = False
+        if self._stop_event is not None:
+            self._stop_event.set()
 
 
 # Global event emitter instance
 event_emitter = EventEmitter()
 
+# A forked worker (e.g. ProcessPoolExecutor) starts with a clean emitter
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=event_emitter._setup)
+
+
+def get_event_emitter() -> EventEmitter:
+    """Return the event emitter of the current process."""
+    return event_emitter
+
 
 # Helper functions for common events
+# These skip emit_sync/emit_nowait and enqueue directly; when nobody listens to the
+# event type, not even the payload dict is built. The *_nowait variants never
+# suspend, so hot paths can call them without an event-loop round-trip; the
+# queued events are dispatched in batches by the processing loop.
+def emit_log_nowait(
+    level: str,
+    message: str,
+    agent_id: Optional[str] = None,
+    job_id: Optional[int] = None,
+    metadata: Optional[Dict[str, Any]] = None
+):
+    """Queue a log event without awaiting."""
+    if EventType.LOG_ENTRY in event_emitter._has_listeners:
+        event_emitter._enqueue(event_emitter._acquire(
+            EventType.LOG_ENTRY,
+            {
+                "level": level,
+                "message": message,
+                "metadata": metadata
+            },
+            agent_id,
+            job_id
+        ))
+
+
+def emit_job_progress_nowait(
+    job_id: int,
+    phase: str,
+    progress: float,
+    message: str,
+    agent_id: Optional[str] = None
+):
+    """Queue a job progress event without awaiting."""
+    if EventType.JOB_PROGRESS in event_emitter._has_listeners:
+        event_emitter._enqueue(event_emitter._acquire(
+            EventType.JOB_PROGRESS,
+            {
+                "phase": phase,
+                "progress": progress,
+                "message": message
+            },
+            agent_id,
+            job_id
+        ))
+
+
+def emit_agent_status_nowait(agent_id: str, status: str, metadata: Optional[Dict[str, Any]] = None):
+    """Queue an agent status change event without awaiting."""
+    if EventType.AGENT_STATUS_CHANGED in event_emitter._has_listeners:
+        event_emitter._enqueue(event_emitter._acquire(
+            EventType.AGENT_STATUS_CHANGED,
+            {
+                "status": status,
+                "metadata": metadata
+            },
+            agent_id,
+            None
+        ))
+
+
 async def emit_log(
     level: str,
     message: str,
@@ -187,16 +511,7 @@ async def emit_log(
     metadata: Optional[Dict[str, Any]] = None
 ):
     """Emit a log event."""
-    await event_emitter.emit_sync(
-        EventType.LOG_ENTRY,
-        {
-            "level": level,
-            "message": message,
-            "metadata": metadata
-        },
-        agent_id=agent_id,
-        job_id=job_id
-    )
+    emit_log_nowait(level, message, agent_id, job_id, metadata)
 
 
 async def emit_job_progress(
@@ -207,25 +522,9 @@ async def emit_job_progress(
     agent_id: Optional[str] = None
 ):
     """Emit a job progress event."""
-    await event_emitter.emit_sync(
-        EventType.JOB_PROGRESS,
-        {
-            "phase": phase,
-            "progress": progress,
-            "message": message
-        },
-        agent_id=agent_id,
-        job_id=job_id
-    )
+    emit_job_progress_nowait(job_id, phase, progress, message, agent_id)
 
 
 async def emit_agent_status(agent_id: str, status: str, metadata: Optional[Dict[str, Any]] = None):
     """Emit an agent status change event."""
-    await event_emitter.emit_sync(
-        EventType.AGENT_STATUS_CHANGED,
-        {
-            "status": status,
-            "metadata": metadata
-        },
-        agent_id=agent_id
-    )
+    emit_agent_status_nowait(agent_id, status, metadata)
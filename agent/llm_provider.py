@@ -26,9 +26,27 @@ Usage:
 
 import os
 from enum import Enum
-from typing import Optional, Dict, Any
-from dataclasses import dataclass
-from langchain_core.language_models import BaseLLM
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Dict, Any
+from dataclasses import dataclass, astuple
+
+from agent.logger import get_logger
+
+if TYPE_CHECKING:  # langchain is imported only when a provider is built
+    from langchain_core.language_models import BaseLLM
+
+logger = get_logger(__name__)
+
+
+@lru_cache(maxsize=None)
+def _env(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Cached os.getenv; call reload_env() after changing the environment"""
+    return os.getenv(name, default)
+
+
+def reload_env():
+    """Forget cached environment values (e.g. after loading a new .env)"""
+    _env.cache_clear()
 
 
 class LLMProvider(str, Enum):
@@ -62,23 +80,23 @@ class LLMConfig:
         """Load from environment if not specified"""
         # Read LLM_MODEL from environment if using default
         if self.model == "qwen2.5-coder:14b":  # Default value
-            self.model = os.getenv("LLM_MODEL", self.model)
+            self.model = _env("LLM_MODEL", self.model)
         
         # Read provider-specific configuration
         if self.provider == LLMProvider.OLLAMA and not self.base_url:
-            self.base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+            self.base_url = _env("OLLAMA_BASE_URL", "http://localhost:11434")
         elif self.provider == LLMProvider.OPENAI and not self.api_key:
-            self.api_key = os.getenv("OPENAI_API_KEY")
+            self.api_key = _env("OPENAI_API_KEY")
         elif self.provider == LLMProvider.DEEPSEEK:
             if not self.api_key:
-                self.api_key = os.getenv("DEEPSEEK_API_KEY")
+                self.api_key = _env("DEEPSEEK_API_KEY")
             if not self.base_url:
-                self.base_url = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com/v1")
+                self.base_url = _env("DEEPSEEK_BASE_URL", "https://api.deepseek.com/v1")
         elif self.provider == LLMProvider.ANTHROPIC and not self.api_key:
-            self.api_key = os.getenv("ANTHROPIC_API_KEY")
+            self.api_key = _env("ANTHROPIC_API_KEY")
         elif self.provider == LLMProvider.AZURE:
-            self.api_key = os.getenv("AZURE_OPENAI_API_KEY")
-            self.base_url = os.getenv("AZURE_OPENAI_ENDPOINT")
+            self.api_key = _env("AZURE_OPENAI_API_KEY")
+            self.base_url = _env("AZURE_OPENAI_ENDPOINT")
 
 
 # Recommended models for ESP32 development
@@ -106,7 +124,24 @@ RECOMMENDED_MODELS = {
 }
 
 
-def get_ollama_llm(config: LLMConfig) -> BaseLLM:
+@lru_cache(maxsize=1)
+def _shared_http_client():
+    """
+    Connection-pooled httpx client shared by all OpenAI-compatible models,
+    so TCP/TLS connections are reused across LLM instances and sync calls.
+    
+    Only the sync client is shared: an httpx.AsyncClient's connections belong
+    to the event loop that opened them, and callers such as batch_fix run
+    each batch in a fresh loop, so async clients stay per instance.
+    
+    httpx is always installed alongside langchain-openai (via openai).
+    """
+    import httpx
+    
+    return httpx.Client(limits=httpx.Limits(max_keepalive_connections=16))
+
+
+def get_ollama_llm(config: LLMConfig) -> "BaseLLM":
     """
     Get Ollama LLM instance
     
@@ -114,6 +149,9 @@ def get_ollama_llm(config: LLMConfig) -> BaseLLM:
         - Ollama installed: brew install ollama
         - Model pulled: ollama pull qwen2.5-coder:14b
         - Server running: ollama serve
+    
+    Sends a 1-token test request before returning; get_llm caches the
+    instance, so the probe runs once per configuration.
     """
     try:
         from langchain_community.llms import Ollama
@@ -145,7 +183,7 @@ def get_ollama_llm(config: LLMConfig) -> BaseLLM:
     return llm
 
 
-def get_openai_llm(config: LLMConfig) -> BaseLLM:
+def get_openai_llm(config: LLMConfig) -> "BaseLLM":
     """
     Get OpenAI LLM instance
     
@@ -174,12 +212,13 @@ def get_openai_llm(config: LLMConfig) -> BaseLLM:
         api_key=config.api_key,
         organization=config.organization,
         timeout=config.timeout,
+        http_client=_shared_http_client(),
     )
     
     return llm
 
 
-def get_deepseek_llm(config: LLMConfig) -> BaseLLM:
+def get_deepseek_llm(config: LLMConfig) -> "BaseLLM":
     """Get DeepSeek LLM instance (OpenAI-compatible API)"""
     try:
         from langchain_openai import ChatOpenAI
@@ -202,11 +241,12 @@ def get_deepseek_llm(config: LLMConfig) -> BaseLLM:
         api_key=api_key,
         base_url=base_url,
         timeout=config.timeout,
+        http_client=_shared_http_client(),
     )
     return llm
 
 
-def get_anthropic_llm(config: LLMConfig) -> BaseLLM:
+def get_anthropic_llm(config: LLMConfig) -> "BaseLLM":
     """
     Get Anthropic Claude LLM instance
     
@@ -239,7 +279,7 @@ def get_anthropic_llm(config: LLMConfig) -> BaseLLM:
     return llm
 
 
-def get_azure_llm(config: LLMConfig) -> BaseLLM:
+def get_azure_llm(config: LLMConfig) -> "BaseLLM":
     """
     Get Azure OpenAI LLM instance
     
@@ -269,12 +309,22 @@ def get_azure_llm(config: LLMConfig) -> BaseLLM:
         azure_endpoint=config.base_url,
         api_key=config.api_key,
         timeout=config.timeout,
+        http_client=_shared_http_client(),
     )
     
     return llm
 
 
-def get_llm(config: Optional[LLMConfig] = None) -> BaseLLM:
+_PROVIDERS = {
+    LLMProvider.OLLAMA: get_ollama_llm,
+    LLMProvider.OPENAI: get_openai_llm,
+    LLMProvider.DEEPSEEK: get_deepseek_llm,
+    LLMProvider.ANTHROPIC: get_anthropic_llm,
+    LLMProvider.AZURE: get_azure_llm,
+}
+
+
+def get_llm(config: Optional[LLMConfig] = None) -> "BaseLLM":
     """
     Get LLM instance with automatic fallback
     
@@ -314,26 +364,17 @@ def get_llm(config: Optional[LLMConfig] = None) -> BaseLLM:
     if config is None:
         config = LLMConfig()
     
-    providers = {
-        LLMProvider.OLLAMA: get_ollama_llm,
-        LLMProvider.OPENAI: get_openai_llm,
-        LLMProvider.DEEPSEEK: get_deepseek_llm,
-        LLMProvider.ANTHROPIC: get_anthropic_llm,
-        LLMProvider.AZURE: get_azure_llm,
-    }
-    
-    # Try primary provider
+    # Instances are reused per configuration: repeated calls skip client
+    # setup and (for Ollama) the connection check round-trip. Only successful
+    # constructions are cached, so a failing provider is retried next time
     try:
-        provider_func = providers[config.provider]
-        llm = provider_func(config)
-        print(f"✅ Using {config.provider.value} model: {config.model}")
-        return llm
+        return _get_llm_cached(astuple(config))
     except Exception as e:
-        print(f"⚠️  Failed to initialize {config.provider.value}: {e}")
+        logger.warning("⚠️  Failed to initialize %s: %s", config.provider.value, e)
         
         # Try fallback to local if enabled
         if config.fallback_to_local and config.provider != LLMProvider.OLLAMA:
-            print("🔄 Attempting fallback to local Ollama model...")
+            logger.info("🔄 Attempting fallback to local Ollama model...")
             try:
                 fallback_config = LLMConfig(
                     provider=LLMProvider.OLLAMA,
@@ -341,11 +382,12 @@ def get_llm(config: Optional[LLMConfig] = None) -> BaseLLM:
                     temperature=config.temperature,
                     base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
                 )
-                llm = get_ollama_llm(fallback_config)
-                print(f"✅ Fallback successful: {fallback_config.model}")
+                # Cached under its own key, so every failing config shares one fallback
+                llm = _get_llm_cached(astuple(fallback_config))
+                logger.info("✅ Fallback successful: %s", fallback_config.model)
                 return llm
             except Exception as fallback_error:
-                print(f"❌ Fallback also failed: {fallback_error}")
+                logger.error("❌ Fallback also failed: %s", fallback_error)
         
         # No fallback or fallback failed
         raise Exception(
@@ -354,6 +396,15 @@ def get_llm(config: Optional[LLMConfig] = None) -> BaseLLM:
         )
 
 
+@lru_cache(maxsize=8)
+def _get_llm_cached(config_key: tuple) -> "BaseLLM":
+    """Build the LLM for a config tuple with its own provider (no fallback)"""
+    config = LLMConfig(*config_key)
+    llm = _PROVIDERS[config.provider](config)
+    logger.info("✅ Using %s model: %s", config.provider.value, config.model)
+    return llm
+
+
 def get_recommended_model(
     provider: LLMProvider,
     tier: str = "balanced"
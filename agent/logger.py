@@ -0,0 +1,35 @@
+"""Non-blocking console logging for agent modules.
+
+Records are put on a queue and written to stdout by a background
+QueueListener thread, so logging never blocks the event loop on a slow
+terminal or pipe. Messages are printed as-is, like the print() output
+they replace.
+"""
+import atexit
+import logging
+import queue
+import sys
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+
+
+@lru_cache(maxsize=1)
+def _queue_handler() -> QueueHandler:
+    """Shared queue handler; starts the writer thread on first use."""
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(logging.Formatter("%(message)s"))
+    listener = QueueListener(records, stream)
+    listener.start()
+    atexit.register(listener.stop)
+    return QueueHandler(records)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Get a logger that writes through the shared background queue."""
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        logger.addHandler(_queue_handler())
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
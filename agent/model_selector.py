@@ -7,26 +7,94 @@ Este módulo implementa la estrategia multi-modelo para optimizar:
 - RAM: Alternar modelos según necesidad
 """
 
-from typing import Dict, Optional, Literal
-from dataclasses import dataclass
+from typing import Dict, Mapping, NamedTuple, Optional, Literal, Tuple
+from collections import Counter
+from functools import lru_cache
+from types import MappingProxyType
 import os
+import sys
+
+__all__ = [
+    "ModelSelector",
+    "ModelConfig",
+    "TaskType",
+    "create_default_selector",
+    "create_fast_selector",
+    "create_quality_selector",
+    "create_low_ram_selector",
+]
 
 TaskType = Literal["analyze", "fix", "validate", "document", "test"]
 
+# Tokens promedio por tarea usados en las estimaciones de tiempo
+DEFAULT_TOKENS_PER_TASK = 500
+
+# Modelo forzado para todas las tareas (leído una vez al importar)
+_ENV_OVERRIDE = os.getenv("LLM_MODEL_OVERRIDE")
+
+
+@lru_cache(maxsize=None)
+def _display_name(name: str, size_gb: float, speed_tokens_per_sec: float) -> str:
+    """Nombre para mostrar, formateado una sola vez por modelo"""
+    return f"{name} ({size_gb}GB, {speed_tokens_per_sec} tok/s)"
 
-@dataclass
-class ModelConfig:
-    """Configuración de un modelo"""
+
+class ModelConfig(NamedTuple):
+    """Configuración de un modelo (inmutable)"""
     name: str
     size_gb: float
     speed_tokens_per_sec: float
     specialization: str
-    best_for: list[str]
+    best_for: frozenset[str]
     
     @property
     def display_name(self) -> str:
         """Nombre para mostrar"""
-        return f"{self.name} ({self.size_gb}GB, {self.speed_tokens_per_sec} tok/s)"
+        return _display_name(self.name, self.size_gb, self.speed_tokens_per_sec)
+
+
+class _ModelCatalog(Mapping[str, ModelConfig]):
+    """Catálogo de solo lectura que crea cada ModelConfig al primer acceso"""
+    
+    __slots__ = ("_raw", "_configs")
+    
+    def __init__(self, raw: Mapping[str, tuple]):
+        self._raw = raw
+        self._configs: Dict[str, ModelConfig] = {}
+    
+    def __getitem__(self, name: str) -> ModelConfig:
+        config = self._configs.get(name)
+        if config is None:
+            config = self._configs[name] = ModelConfig(name, *self._raw[name])
+        return config
+    
+    def __iter__(self):
+        return iter(self._raw)
+    
+    def __len__(self) -> int:
+        return len(self._raw)
+    
+    def __contains__(self, name: object) -> bool:
+        return name in self._raw
+
+
+def _frozen_catalog(models: Dict[str, tuple]) -> Mapping[str, tuple]:
+    """Catálogo de solo lectura con los nombres de modelo internados"""
+    return MappingProxyType({sys.intern(name): raw for name, raw in models.items()})
+
+
+def _frozen_task_mapping(mapping: Dict[str, str]) -> Mapping[str, str]:
+    """Mapeo tarea -> modelo de solo lectura, con claves y valores internados
+    (las búsquedas en el catálogo comparan por identidad antes que por valor)"""
+    return MappingProxyType({sys.intern(task): sys.intern(model) for task, model in mapping.items()})
+
+
+def _group_by_specialization(raw_models: Mapping[str, tuple]) -> Dict[str, Tuple[str, ...]]:
+    """Agrupa los nombres de modelos por especialización (en orden del catálogo)"""
+    groups: Dict[str, list[str]] = {}
+    for name, (_, _, specialization, _) in raw_models.items():
+        groups.setdefault(specialization, []).append(name)
+    return {spec: tuple(names) for spec, names in groups.items()}
 
 
 class ModelSelector:
@@ -50,111 +118,113 @@ class ModelSelector:
         >>> print(model)  # "gemma2:2b"
     """
     
-    # Catálogo de modelos disponibles
-    AVAILABLE_MODELS: Dict[str, ModelConfig] = {
+    # Catálogo de modelos disponibles:
+    # nombre -> (size_gb, speed_tokens_per_sec, specialization, best_for)
+    _RAW_MODELS: Mapping[str, Tuple[float, float, str, frozenset]] = _frozen_catalog({
         # Modelos especializados en código
-        "qwen2.5-coder:14b": ModelConfig(
-            name="qwen2.5-coder:14b",
-            size_gb=8.5,
-            speed_tokens_per_sec=3.0,
-            specialization="code",
-            best_for=["fix", "test", "refactor"]
-        ),
-        "deepseek-coder:16b": ModelConfig(
-            name="deepseek-coder:16b",
-            size_gb=9.2,
-            speed_tokens_per_sec=2.5,
-            specialization="code",
-            best_for=["fix", "refactor", "complex"]
-        ),
-        "codellama:13b": ModelConfig(
-            name="codellama:13b",
-            size_gb=7.4,
-            speed_tokens_per_sec=3.5,
-            specialization="code",
-            best_for=["completion", "snippets"]
-        ),
+        "qwen2.5-coder:14b": (8.5, 3.0, "code", frozenset({"fix", "test", "refactor"})),
+        "deepseek-coder:16b": (9.2, 2.5, "code", frozenset({"fix", "refactor", "complex"})),
+        "codellama:13b": (7.4, 3.5, "code", frozenset({"completion", "snippets"})),
         
         # Modelos balanceados
-        "gemma2:9b": ModelConfig(
-            name="gemma2:9b",
-            size_gb=5.5,
-            speed_tokens_per_sec=5.0,
-            specialization="general",
-            best_for=["analyze", "document", "explain"]
-        ),
+        "gemma2:9b": (5.5, 5.0, "general", frozenset({"analyze", "document", "explain"})),
         
         # Modelos rápidos y ligeros
-        "gemma2:2b": ModelConfig(
-            name="gemma2:2b",
-            size_gb=1.6,
-            speed_tokens_per_sec=15.0,
-            specialization="general",
-            best_for=["analyze", "validate", "classify"]
-        ),
-        "llama3.2:3b": ModelConfig(
-            name="llama3.2:3b",
-            size_gb=2.0,
-            speed_tokens_per_sec=12.0,
-            specialization="general",
-            best_for=["document", "explain", "simple"]
-        ),
-        "llama3.2:1b": ModelConfig(
-            name="llama3.2:1b",
-            size_gb=1.3,
-            speed_tokens_per_sec=20.0,
-            specialization="general",
-            best_for=["classify", "simple"]
-        ),
+        "gemma2:2b": (1.6, 15.0, "general", frozenset({"analyze", "validate", "classify"})),
+        "llama3.2:3b": (2.0, 12.0, "general", frozenset({"document", "explain", "simple"})),
+        "llama3.2:1b": (1.3, 20.0, "general", frozenset({"classify", "simple"})),
+    })
+    
+    # Vista pública del catálogo; cada ModelConfig se crea al primer acceso
+    AVAILABLE_MODELS: Mapping[str, ModelConfig] = _ModelCatalog(_RAW_MODELS)
+    
+    # especialización -> nombres de modelos, para list_available_models
+    _NAMES_BY_SPECIALIZATION: Dict[str, Tuple[str, ...]] = _group_by_specialization(_RAW_MODELS)
+    
+    # nombre -> bit para contar modelos distintos (los modelos fuera del
+    # catálogo, p.ej. un override, reciben un índice nuevo al aparecer)
+    _MODEL_IDX: Dict[str, int] = {name: i for i, name in enumerate(_RAW_MODELS)}
+    
+    # nombre -> (size_gb, speed_tokens_per_sec), para los estimadores
+    _MODEL_STATS: Dict[str, Tuple[float, float]] = {
+        name: (size_gb, speed) for name, (size_gb, speed, _, _) in _RAW_MODELS.items()
     }
     
+    # nombre -> segundos por tarea con DEFAULT_TOKENS_PER_TASK (caso habitual
+    # de estimate_total_time y compare_strategies, sin dividir en cada tarea)
+    _SECS_PER_TASK: Dict[str, float] = {
+        name: DEFAULT_TOKENS_PER_TASK / speed for name, (_, speed) in _MODEL_STATS.items()
+    }
+    
+    # Modelo más grande del catálogo: ninguna tarea puede superar este peak
+    _GLOBAL_MAX_SIZE: float = max(size_gb for size_gb, _ in _MODEL_STATS.values())
+    
     # Mapeo de tareas a modelos (estrategia optimizada)
-    TASK_MODEL_MAPPING: Dict[str, Dict[str, str]] = {
+    TASK_MODEL_MAPPING: Mapping[str, Mapping[str, str]] = MappingProxyType({
         # Estrategia balanceada (default)
-        "balanced": {
+        "balanced": _frozen_task_mapping({
             "analyze": "gemma2:2b",        # Rápido para analizar errores
             "fix": "qwen2.5-coder:14b",    # Especialista para fix
             "validate": "gemma2:2b",       # Rápido para validar
             "document": "llama3.2:3b",     # Bueno para explicar
             "test": "qwen2.5-coder:14b",   # Especialista para tests
-        },
+        }),
         
         # Estrategia de máxima calidad
-        "quality": {
+        "quality": _frozen_task_mapping({
             "analyze": "gemma2:9b",
             "fix": "qwen2.5-coder:14b",
             "validate": "gemma2:9b",
             "document": "gemma2:9b",
             "test": "qwen2.5-coder:14b",
-        },
+        }),
         
         # Estrategia de máxima velocidad
-        "fast": {
+        "fast": _frozen_task_mapping({
             "analyze": "gemma2:2b",
             "fix": "gemma2:2b",
             "validate": "gemma2:2b",
             "document": "llama3.2:1b",
             "test": "gemma2:2b",
-        },
+        }),
         
         # Estrategia de mínimo RAM
-        "low_ram": {
+        "low_ram": _frozen_task_mapping({
             "analyze": "llama3.2:1b",
             "fix": "gemma2:2b",
             "validate": "llama3.2:1b",
             "document": "llama3.2:1b",
             "test": "gemma2:2b",
-        },
+        }),
         
         # Estrategia modelo único (actual)
-        "single": {
+        "single": _frozen_task_mapping({
             "analyze": "qwen2.5-coder:14b",
             "fix": "qwen2.5-coder:14b",
             "validate": "qwen2.5-coder:14b",
             "document": "qwen2.5-coder:14b",
             "test": "qwen2.5-coder:14b",
-        },
-    }
+        }),
+    })
+    
+    # Sin __dict__ por instancia: atributos en posiciones fijas
+    __slots__ = (
+        "strategy",
+        "fallback_model",
+        "override_model",
+        "_mapping",
+        "_sizes",
+        "_inv_speeds",
+        "_default_size",
+        "_default_inv_speed",
+        "_secs_per_task",
+        "_default_secs_per_task",
+        "_task_models",
+        "_default_model",
+    )
+    
+    # Selectores por defecto por estrategia, usados por compare_strategies
+    _SELECTOR_CACHE: Dict[str, "ModelSelector"] = {}
     
     def __init__(
         self,
@@ -172,14 +242,42 @@ class ModelSelector:
         """
         self.strategy = strategy
         self.fallback_model = fallback_model or "qwen2.5-coder:14b"
-        self.override_model = override_model or os.getenv("LLM_MODEL_OVERRIDE")
+        self.override_model = override_model or _ENV_OVERRIDE
         
-        # Validar estrategia
-        if strategy not in self.TASK_MODEL_MAPPING:
+        # Validar estrategia y resolver su mapeo tarea -> modelo (una sola búsqueda)
+        try:
+            self._mapping = self.TASK_MODEL_MAPPING[strategy]
+        except KeyError:
             raise ValueError(
                 f"Estrategia inválida: {strategy}. "
                 f"Opciones: {list(self.TASK_MODEL_MAPPING.keys())}"
-            )
+            ) from None
+        
+        # Tablas tarea -> (RAM, 1/velocidad) para los estimadores; las tareas
+        # fuera de la tabla usan el modelo de respaldo (o el override)
+        if self.override_model:
+            self._sizes, self._inv_speeds, self._secs_per_task = {}, {}, {}
+            default_model = self.override_model
+        else:
+            table = STRATEGY_TABLES[strategy]
+            self._sizes, self._inv_speeds = table["sizes"], table["inv_speeds"]
+            self._secs_per_task = table["secs_per_task"]
+            default_model = self.fallback_model
+        self._default_size, self._default_inv_speed = _model_rates(default_model)
+        self._default_secs_per_task = self._SECS_PER_TASK.get(default_model, 0.0)
+        
+        # Tabla tarea -> modelo y modelo por defecto para get_model_for_task;
+        # con override la tabla queda vacía y siempre se usa el override
+        self._task_models = {} if self.override_model else self._mapping
+        self._default_model = default_model
+    
+    @classmethod
+    def _get_selector(cls, strategy: str) -> "ModelSelector":
+        """Selector con la configuración por defecto de una estrategia (cacheado)"""
+        selector = cls._SELECTOR_CACHE.get(strategy)
+        if selector is None:
+            selector = cls._SELECTOR_CACHE[strategy] = cls(strategy=strategy)
+        return selector
     
     def get_model_for_task(self, task_type: TaskType) -> str:
         """
@@ -199,13 +297,8 @@ class ModelSelector:
             >>> selector.get_model_for_task("analyze")
             'gemma2:2b'
         """
-        # Si hay override, usar ese modelo para todo
-        if self.override_model:
-            return self.override_model
-        
-        # Obtener modelo según estrategia y tarea
-        mapping = self.TASK_MODEL_MAPPING[self.strategy]
-        return mapping.get(task_type, self.fallback_model)
+        # Override y estrategia ya están resueltos en la tabla (una búsqueda)
+        return self._task_models.get(task_type, self._default_model)
     
     def get_model_config(self, model_name: str) -> Optional[ModelConfig]:
         """
@@ -235,20 +328,19 @@ class ModelSelector:
             >>> ram = selector.estimate_memory_usage(tasks)
             >>> print(f"{ram:.1f}GB")  # "8.5GB" (peak por fix)
         """
-        models_needed = set(
-            self.get_model_for_task(task) for task in task_sequence
-        )
-        
-        # El peak será el modelo más grande (no se cargan simultáneos)
+        # El peak será el modelo más grande (no se cargan simultáneos);
+        # al alcanzar el máximo del catálogo no hace falta seguir
+        sizes, default, ceiling = self._sizes, self._default_size, self._GLOBAL_MAX_SIZE
         max_ram = 0.0
-        for model_name in models_needed:
-            config = self.get_model_config(model_name)
-            if config:
-                max_ram = max(max_ram, config.size_gb)
-        
+        for task in task_sequence:
+            size = sizes.get(task, default)
+            if size > max_ram:
+                max_ram = size
+                if max_ram >= ceiling:
+                    break
         return max_ram
     
-    def estimate_total_time(self, task_sequence: list[TaskType], tokens_per_task: int = 500) -> float:
+    def estimate_total_time(self, task_sequence: list[TaskType], tokens_per_task: int = DEFAULT_TOKENS_PER_TASK) -> float:
         """
         Estima el tiempo total para una secuencia de tareas.
         
@@ -259,18 +351,12 @@ class ModelSelector:
         Returns:
             Tiempo estimado en segundos
         """
-        total_time = 0.0
-        
-        for task in task_sequence:
-            model_name = self.get_model_for_task(task)
-            config = self.get_model_config(model_name)
-            
-            if config:
-                # Tiempo = tokens / velocidad
-                task_time = tokens_per_task / config.speed_tokens_per_sec
-                total_time += task_time
-        
-        return total_time
+        # Tiempo = tokens / velocidad; con los tokens por defecto ya está precalculado
+        if tokens_per_task == DEFAULT_TOKENS_PER_TASK:
+            secs, default = self._secs_per_task, self._default_secs_per_task
+            return sum(secs.get(task, default) for task in task_sequence)
+        inv_speeds, default = self._inv_speeds, self._default_inv_speed
+        return sum(inv_speeds.get(task, default) for task in task_sequence) * tokens_per_task
     
     def list_available_models(self, specialization: Optional[str] = None) -> list[str]:
         """
@@ -283,10 +369,7 @@ class ModelSelector:
             Lista de nombres de modelos
         """
         if specialization:
-            return [
-                name for name, config in self.AVAILABLE_MODELS.items()
-                if config.specialization == specialization
-            ]
+            return list(self._NAMES_BY_SPECIALIZATION.get(specialization, ()))
         return list(self.AVAILABLE_MODELS.keys())
     
     def get_strategy_info(self) -> Dict[str, str]:
@@ -294,9 +377,9 @@ class ModelSelector:
         Obtiene información sobre la estrategia actual.
         
         Returns:
-            Diccionario con mapeo tarea -> modelo
+            Diccionario con mapeo tarea -> modelo (copia; se puede modificar)
         """
-        return self.TASK_MODEL_MAPPING[self.strategy].copy()
+        return dict(self._mapping)
     
     def compare_strategies(self, task_sequence: list[TaskType]) -> Dict[str, Dict[str, float]]:
         """
@@ -317,26 +400,81 @@ class ModelSelector:
         """
         results = {}
         
+        # Cada tarea distinta se resuelve una vez por estrategia; las
+        # repeticiones sólo pesan en el tiempo
+        task_counts = Counter(task_sequence)
+        # Copia local: modelos fuera del catálogo (p. ej. un override) se
+        # numeran aquí sin hacer crecer la tabla compartida por la clase
+        model_idx = dict(self._MODEL_IDX)
+        
         for strategy_name in self.TASK_MODEL_MAPPING.keys():
-            # Crear selector temporal con esta estrategia
-            temp_selector = ModelSelector(strategy=strategy_name)
+            # Selector por defecto de esta estrategia (reutilizado entre llamadas)
+            temp_selector = self._get_selector(strategy_name)
+            sizes, default_size = temp_selector._sizes, temp_selector._default_size
+            secs, default_secs = temp_selector._secs_per_task, temp_selector._default_secs_per_task
+            
+            get_model = temp_selector.get_model_for_task
             
-            # Calcular métricas
-            ram = temp_selector.estimate_memory_usage(task_sequence)
-            time = temp_selector.estimate_total_time(task_sequence)
+            # Una sola pasada: peak de RAM, tiempo acumulado y modelos
+            # distintos (como bits de un entero, sin crear un set)
+            ram = 0.0
+            time = 0.0
+            used = 0
+            for task, count in task_counts.items():
+                size = sizes.get(task, default_size)
+                if size > ram:
+                    ram = size
+                time += secs.get(task, default_secs) * count
+                used |= 1 << model_idx.setdefault(get_model(task), len(model_idx))
             
             results[strategy_name] = {
                 "ram_gb": ram,
                 "time_seconds": time,
-                "models_used": len(set(
-                    temp_selector.get_model_for_task(task) 
-                    for task in task_sequence
-                ))
+                "models_used": used.bit_count()
             }
         
         return results
 
 
+def _model_rates(model_name: str) -> Tuple[float, float]:
+    """(RAM en GB, segundos por token) de un modelo; (0, 0) si no está en el catálogo"""
+    stats = ModelSelector._MODEL_STATS.get(model_name)
+    if not stats:
+        return 0.0, 0.0
+    return stats[0], 1.0 / stats[1]
+
+
+def _build_strategy_tables() -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Resuelve, para cada estrategia, tarea -> RAM, tarea -> 1/velocidad y
+    tarea -> segundos con DEFAULT_TOKENS_PER_TASK"""
+    tables = {}
+    secs_per_task = ModelSelector._SECS_PER_TASK
+    for strategy, mapping in ModelSelector.TASK_MODEL_MAPPING.items():
+        rates = {task: _model_rates(model) for task, model in mapping.items()}
+        tables[strategy] = {
+            "sizes": {task: size for task, (size, _) in rates.items()},
+            "inv_speeds": {task: inv for task, (_, inv) in rates.items()},
+            "secs_per_task": {task: secs_per_task.get(model, 0.0) for task, model in mapping.items()},
+        }
+    return tables
+
+
+def _validate_task_mapping():
+    """Comprueba al importar que cada estrategia sólo usa modelos del catálogo"""
+    for strategy, mapping in ModelSelector.TASK_MODEL_MAPPING.items():
+        unknown = set(mapping.values()) - ModelSelector._RAW_MODELS.keys()
+        if unknown:
+            raise ValueError(
+                f"Estrategia {strategy} usa modelos fuera del catálogo: {sorted(unknown)}"
+            )
+
+
+_validate_task_mapping()
+
+# Estrategias y catálogo son estáticos: se resuelven una vez al importar
+STRATEGY_TABLES = _build_strategy_tables()
+
+
 # Factory functions para casos comunes
 def create_default_selector() -> ModelSelector:
     """Crea un selector con estrategia balanceada (recomendado)"""
@@ -359,7 +497,8 @@ def create_low_ram_selector() -> ModelSelector:
 
 
 # Ejemplo de uso
-if __name__ == "__main__":
+def _demo():
+    """Muestra la selección, estimaciones y comparación de estrategias"""
     # Ejemplo 1: Uso básico
     print("=" * 80)
     print("EJEMPLO 1: Uso básico")
@@ -403,3 +542,7 @@ if __name__ == "__main__":
             f"{metrics['time_seconds']:<15.1f} "
             f"{metrics['models_used']:<10}"
         )
+
+
+if __name__ == "__main__":
+    _demo()
@@ -4,18 +4,57 @@ Coordinates specialized agents for parallel and sequential task execution
 """
 
 import asyncio
-from typing import Dict, List, Optional, Any
+import graphlib
+import hashlib
+import itertools
+from typing import Awaitable, Callable, Dict, Iterator, List, Mapping, Optional, Any, Tuple
 from dataclasses import dataclass
-from enum import Enum
-from datetime import datetime
+from enum import Enum, IntEnum
 import os
+import re
+import time
 from pathlib import Path
+from types import MappingProxyType
 
 # Import LLM-powered code fixer
 from .code_fixer import create_code_fixer, ESP32CodeFixer
 
 # Import event emitter for real-time dashboard updates
-from .event_emitter import event_emitter, EventType, emit_log, emit_job_progress, emit_agent_status
+from .event_emitter import event_emitter, EventType, emit_log_nowait, emit_job_progress_nowait, emit_agent_status_nowait
+
+# Completed-task journal for resuming interrupted workflows
+from .workspace_state import TASK_JOURNAL_NAME, TaskJournal
+
+# Console output goes through a background queue so tasks never block on stdout
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+# QEMU boot polling: stop as soon as the expected output shows up
+QEMU_BOOT_TIMEOUT = 3.0  # seconds, upper bound on the wait
+QEMU_POLL_INTERVAL = 0.2  # seconds between output reads
+QEMU_OUTPUT_LINES = 100
+
+# Everything under the project is fingerprinted to skip rebuilding unchanged
+# sources (partition tables, component manifests, ...), except these top-level
+# entries: outputs and agent state, and files that set-target or the build
+# regenerate from fingerprinted inputs (target, sdkconfig.defaults,
+# idf_component.yml), which would otherwise change the key on every run
+FINGERPRINT_SKIP = frozenset({
+    "build", ".git", ".agent",
+    "sdkconfig", "sdkconfig.old", "dependencies.lock", "managed_components",
+})
+
+# Workflow artifacts produced by an action: action -> (artifact key, result key)
+ACTION_ARTIFACTS = {
+    "compile_and_cache": ("build", "artifacts"),
+}
+
+# Actions never journaled (so always rerun): they drive hardware or the
+# emulator, or judge outputs of those runs, which a rerun must observe anew
+UNJOURNALED_ACTIONS = frozenset({
+    "flash_to_hardware", "start_qemu", "run_diagnostics", "analyze_results",
+})
 
 
 class TaskStatus(Enum):
@@ -27,6 +66,36 @@ class TaskStatus(Enum):
     BLOCKED = "blocked"
 
 
+class Tool(IntEnum):
+    """MCP tools used by the agent handlers (tool name = member name in lowercase)"""
+    LIST_FILES = 0
+    IDF_SET_TARGET = 1
+    IDF_BUILD = 2
+    GET_BUILD_ARTIFACTS = 3
+    IDF_FLASH = 4
+    RUN_QEMU_SIMULATION = 5
+    QEMU_GET_OUTPUT = 6
+    STOP_QEMU_SIMULATION = 7
+    IDF_DOCTOR = 8
+
+
+def _missing_tool(name: str) -> Callable[..., str]:
+    """Stand-in for a tool the MCP server doesn't provide (fails when used)"""
+    def invoke(*args, **kwargs):
+        raise KeyError(name)
+    return invoke
+
+
+# Icons shown per task status in the workflow summary
+_STATUS_ICONS = {
+    TaskStatus.COMPLETED: "✅",
+    TaskStatus.FAILED: "❌",
+    TaskStatus.IN_PROGRESS: "🔄",
+    TaskStatus.PENDING: "⏳",
+    TaskStatus.BLOCKED: "🚫"
+}
+
+
 class AgentRole(Enum):
     """Agent roles in the development workflow"""
     PROJECT_MANAGER = "project_manager"  # Coordinates workflow, imports projects
@@ -37,21 +106,95 @@ class AgentRole(Enum):
     QA = "qa"                           # Validates and reports issues
 
 
-@dataclass
+# Role labels for log lines and the summary (plain dict lookup, no Enum.value descriptor)
+_ROLE_LABEL: Dict[AgentRole, str] = {role: role.value for role in AgentRole}
+
+
+# Maximum concurrently running tasks per agent role; roles whose tools share
+# a single idf.py workdir or device run one at a time
+ROLE_CONCURRENCY = {
+    AgentRole.PROJECT_MANAGER: 1,
+    AgentRole.DEVELOPER: 2,
+    AgentRole.BUILDER: 1,
+    AgentRole.TESTER: 2,
+    AgentRole.DOCTOR: 1,
+    AgentRole.QA: 4,
+}
+
+
+# Agent roles and their capabilities (read-only, shared by all orchestrators)
+_AGENT_ROLES: Mapping[AgentRole, Mapping[str, Tuple[str, ...]]] = MappingProxyType({
+    AgentRole.PROJECT_MANAGER: MappingProxyType({
+        "tools": ("list_files", "read_source_file", "idf_set_target"),
+        "responsibilities": (
+            "Import/validate project structure",
+            "Set target chip",
+            "Coordinate workflow phases"
+        )
+    }),
+    AgentRole.DEVELOPER: MappingProxyType({
+        "tools": ("read_source_file", "write_source_file", "list_files"),
+        "responsibilities": (
+            "Create/modify source code",
+            "Fix bugs reported by QA",
+            "Implement new features"
+        )
+    }),
+    AgentRole.BUILDER: MappingProxyType({
+        "tools": ("idf_build", "idf_clean", "idf_size", "get_build_artifacts"),
+        "responsibilities": (
+            "Compile firmware",
+            "Generate build artifacts",
+            "Report build errors"
+        )
+    }),
+    AgentRole.TESTER: MappingProxyType({
+        "tools": (
+            "idf_flash", "run_qemu_simulation", "stop_qemu_simulation",
+            "qemu_simulation_status", "qemu_get_output"
+        ),
+        "responsibilities": (
+            "Flash to hardware (parallel)",
+            "Run QEMU simulation (parallel)",
+            "Collect test outputs"
+        )
+    }),
+    AgentRole.DOCTOR: MappingProxyType({
+        "tools": ("idf_doctor", "qemu_inspect_state"),
+        "responsibilities": (
+            "Validate hardware setup",
+            "Check environment",
+            "Inspect simulation state"
+        )
+    }),
+    AgentRole.QA: MappingProxyType({
+        "tools": (
+            "qemu_get_output", "read_source_file", "list_files", "idf_size"
+        ),
+        "responsibilities": (
+            "Analyze test results",
+            "Detect failures/anomalies",
+            "Report issues to Developer",
+            "Validate fixes"
+        )
+    }),
+})
+
+
+@dataclass(slots=True)
 class Task:
     """Individual task in the workflow"""
     id: str
     role: AgentRole
     action: str
-    dependencies: List[str]  # Task IDs that must complete first
+    dependencies: frozenset[str]  # Task IDs that must complete first
     status: TaskStatus
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
-    timestamp: Optional[datetime] = None
-    can_parallelize: bool = False
+    start_ns: Optional[int] = None  # time.monotonic_ns() when the task started
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkflowState:
     """Current state of the development workflow"""
     project_path: str
@@ -61,6 +204,91 @@ class WorkflowState:
     artifacts: Dict[str, Any]
     qa_iterations: int = 0
     max_qa_iterations: int = 3
+    fast_fail: bool = True  # QA stops at the first high-severity issue
+
+
+class DynamicSorter:
+    """
+    Incremental topological scheduler over task IDs.
+    
+    Tracks the number of unmet dependencies per task and releases a task
+    once all of them are done, so each edge is visited once (O(V+E)).
+    Unlike graphlib.TopologicalSorter, tasks can still be added after
+    scheduling has started (e.g. QA feedback tasks).
+    """
+    
+    def __init__(self):
+        self._unmet: Dict[str, int] = {}          # task -> unmet dependency count
+        self._dependents: Dict[str, List[str]] = {}  # task -> tasks waiting on it
+        self._done: set = set()
+        self._ready: List[str] = []
+    
+    def add(self, task_id: str, *dependencies: str):
+        """Add a task; dependencies already done do not block it"""
+        unmet = 0
+        for dep in dependencies:
+            if dep not in self._done:
+                self._dependents.setdefault(dep, []).append(task_id)
+                unmet += 1
+        self._unmet[task_id] = unmet
+        if not unmet:
+            self._ready.append(task_id)
+    
+    def get_ready(self) -> Tuple[str, ...]:
+        """Return (and hand out) all tasks whose dependencies are done"""
+        ready = tuple(self._ready)
+        self._ready.clear()
+        return ready
+    
+    def done(self, task_id: str):
+        """Mark a task as done, releasing the tasks waiting on it"""
+        self._done.add(task_id)
+        self._unmet.pop(task_id, None)
+        for dependent in self._dependents.pop(task_id, ()):
+            self._unmet[dependent] -= 1
+            if not self._unmet[dependent]:
+                self._ready.append(dependent)
+    
+    def is_active(self) -> bool:
+        """True while some added task has not been marked done"""
+        return bool(self._unmet)
+
+
+def _source_fingerprint(project_path: str, target: str) -> Optional[str]:
+    """
+    Fingerprint the project's build inputs from the relative path and
+    contents of every file under the project, except FINGERPRINT_SKIP at the
+    top level. Contents rather than mtimes, so a checkout or a tool that
+    rewrites a file unchanged does not invalidate the key.
+    
+    Returns None if the project directory is not accessible.
+    """
+    root = Path(project_path)
+    if not root.is_dir():
+        return None
+    
+    digest = hashlib.blake2b(target.encode(), digest_size=16)
+    stack = [str(root)]
+    while stack:
+        path = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda entry: entry.name, reverse=True)
+        except OSError:
+            continue
+        for entry in entries:
+            if path == str(root) and entry.name in FINGERPRINT_SKIP:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+                continue
+            try:
+                with open(entry.path, "rb") as f:
+                    content = hashlib.file_digest(f, "blake2b").digest()
+            except OSError:
+                continue  # e.g. a dangling symlink
+            digest.update(f"{os.path.relpath(entry.path, root)}\0".encode() + content)
+    return digest.hexdigest()
 
 
 class AgentOrchestrator:
@@ -69,6 +297,10 @@ class AgentOrchestrator:
     Handles task dependencies, parallelization, and feedback loops.
     """
     
+    # QA markers in QEMU output, found in one scan: the expected greeting
+    # (case-sensitive) and runtime errors (case-insensitive)
+    _QA_PATTERN = re.compile(r"Hello World|(?i:error|abort)")
+    
     def __init__(self, langchain_tools: List[Any], llm_provider: str = "ollama", llm_model: Optional[str] = None):
         """
         Initialize orchestrator with LangChain tools and LLM-powered code fixer.
@@ -80,95 +312,62 @@ class AgentOrchestrator:
         """
         self.tools = {tool.name: tool for tool in langchain_tools}
         self.state: Optional[WorkflowState] = None
-        self.agent_roles = self._initialize_agents()
+        self.agent_roles = _AGENT_ROLES
+        
+        # Resolve the handlers' tools once into bound invoke callables, indexed by Tool
+        self._tool_invoke = tuple(
+            self.tools[name].invoke if name in self.tools else _missing_tool(name)
+            for name in (tool.name.lower() for tool in Tool)
+        )
         self.current_job_id: Optional[int] = None  # Track current job for event emission
+        self._sorter: Optional[DynamicSorter] = None  # Dependency tracking for the running workflow
+        self._build_cache: Dict[str, Any] = {}  # source fingerprint -> build artifacts
+        self._journal: Optional[TaskJournal] = None  # Completed tasks of the current project
+        self._inputs_hash: Dict[str, str] = {}  # planned task id -> source fingerprint it ran on
+        self._file_cache: Dict[str, Tuple[int, int, str]] = {}  # path -> (mtime_ns, size, content)
+        self._role_sem = {role: asyncio.Semaphore(limit) for role, limit in ROLE_CONCURRENCY.items()}
         
-        # Initialize LLM-powered code fixer
+        # Task action -> handler (one lookup per task instead of an if/elif chain)
+        self._handlers: Dict[str, Callable[[Task], Awaitable[Dict[str, Any]]]] = {
+            "validate_project_structure": lambda task: self._project_manager_validate(),
+            "set_chip_target": lambda task: self._project_manager_set_target(),
+            "compile_and_cache": lambda task: self._builder_compile(),
+            "flash_to_hardware": lambda task: self._tester_flash(),
+            "start_qemu": lambda task: self._tester_qemu(),
+            "run_diagnostics": lambda task: self._doctor_check(),
+            "analyze_results": lambda task: self._qa_analyze(),
+            "fix_issues": lambda task: self._developer_fix(task.result.get("issues", [])),
+        }
+        
+        # Initialize LLM-powered code fixer; diagnostics are not run by the
+        # fixer (its worker threads would call the MCP tool concurrently), the
+        # developer agent passes in a report collected once per fix task
         self.code_fixer = create_code_fixer(provider=llm_provider, model=llm_model)
-        print(f"🤖 Code fixer initialized: {llm_provider} ({self.code_fixer.model})")
+        logger.info("🤖 Code fixer initialized: %s (%s)", llm_provider, self.code_fixer.model)
     
-    async def _emit_event(self, level: str, message: str, agent_id: Optional[str] = None):
-        """Emit log event to dashboard."""
+    def _emit_event(self, level: str, message: str, agent_id: Optional[str] = None):
+        """Emit log event to dashboard (queued, never suspends)."""
         try:
-            await emit_log(level, message, agent_id=agent_id, job_id=self.current_job_id)
+            emit_log_nowait(level, message, agent_id=agent_id, job_id=self.current_job_id)
         except Exception as e:
-            print(f"⚠️  Failed to emit event: {e}")
+            logger.warning("⚠️  Failed to emit event: %s", e)
     
-    async def _emit_progress(self, phase: str, progress: int, message: str, agent_id: Optional[str] = None):
-        """Emit progress event to dashboard."""
+    def _emit_progress(self, phase: str, progress: int, message: str, agent_id: Optional[str] = None):
+        """Emit progress event to dashboard (queued, never suspends)."""
         try:
             if self.current_job_id:
-                await emit_job_progress(self.current_job_id, phase, progress, message, agent_id=agent_id)
+                emit_job_progress_nowait(self.current_job_id, phase, progress, message, agent_id=agent_id)
         except Exception as e:
-            print(f"⚠️  Failed to emit progress: {e}")
+            logger.warning("⚠️  Failed to emit progress: %s", e)
     
-    async def _update_agent_status(self, agent_id: str, status: str):
-        """Update agent status in dashboard."""
+    def _update_agent_status(self, agent_id: str, status: str):
+        """Update agent status in dashboard (queued, never suspends)."""
         try:
-            await emit_agent_status(agent_id, status)
+            emit_agent_status_nowait(agent_id, status)
         except Exception as e:
-            print(f"⚠️  Failed to update agent status: {e}")
+            logger.warning("⚠️  Failed to update agent status: %s", e)
 
         
-    def _initialize_agents(self) -> Dict[AgentRole, Dict[str, Any]]:
-        """Define agent roles and their capabilities"""
-        return {
-            AgentRole.PROJECT_MANAGER: {
-                "tools": ["list_files", "read_source_file", "idf_set_target"],
-                "responsibilities": [
-                    "Import/validate project structure",
-                    "Set target chip",
-                    "Coordinate workflow phases"
-                ]
-            },
-            AgentRole.DEVELOPER: {
-                "tools": ["read_source_file", "write_source_file", "list_files"],
-                "responsibilities": [
-                    "Create/modify source code",
-                    "Fix bugs reported by QA",
-                    "Implement new features"
-                ]
-            },
-            AgentRole.BUILDER: {
-                "tools": ["idf_build", "idf_clean", "idf_size", "get_build_artifacts"],
-                "responsibilities": [
-                    "Compile firmware",
-                    "Generate build artifacts",
-                    "Report build errors"
-                ]
-            },
-            AgentRole.TESTER: {
-                "tools": [
-                    "idf_flash", "run_qemu_simulation", "stop_qemu_simulation",
-                    "qemu_simulation_status", "qemu_get_output"
-                ],
-                "responsibilities": [
-                    "Flash to hardware (parallel)",
-                    "Run QEMU simulation (parallel)",
-                    "Collect test outputs"
-                ]
-            },
-            AgentRole.DOCTOR: {
-                "tools": ["idf_doctor", "qemu_inspect_state"],
-                "responsibilities": [
-                    "Validate hardware setup",
-                    "Check environment",
-                    "Inspect simulation state"
-                ]
-            },
-            AgentRole.QA: {
-                "tools": [
-                    "qemu_get_output", "read_source_file", "list_files", "idf_size"
-                ],
-                "responsibilities": [
-                    "Analyze test results",
-                    "Detect failures/anomalies",
-                    "Report issues to Developer",
-                    "Validate fixes"
-                ]
-            }
-        }
-    
     async def execute_workflow(
         self,
         project_path: str,
@@ -194,8 +393,8 @@ class AgentOrchestrator:
         self.current_job_id = job_id
         
         # Emit workflow start
-        await self._emit_event("INFO", f"🚀 Starting workflow for project: {project_path}")
-        await self._emit_progress("init", 0, "Initializing workflow")
+        self._emit_event("INFO", f"🚀 Starting workflow for project: {project_path}")
+        self._emit_progress("init", 0, "Initializing workflow")
         
         # Initialize workflow state
         self.state = WorkflowState(
@@ -206,7 +405,7 @@ class AgentOrchestrator:
             artifacts={}
         )
         
-        await self._emit_event("INFO", f"Target chip: {target}")
+        self._emit_event("INFO", f"Target chip: {target}")
         
         # Define workflow phases
         workflow = await self._create_workflow_plan(flash_device, run_qemu)
@@ -231,7 +430,7 @@ class AgentOrchestrator:
         1. Project Setup (sequential)
         2. Build (sequential)
         3. Testing (parallel: flash + QEMU)
-        4. Validation (parallel: doctor + QA analysis)
+        4. Validation (pipelined: flash -> doctor, QEMU -> QA analysis)
         5. Feedback Loop (if QA finds issues)
         """
         tasks = []
@@ -241,7 +440,7 @@ class AgentOrchestrator:
             id="setup_project",
             role=AgentRole.PROJECT_MANAGER,
             action="validate_project_structure",
-            dependencies=[],
+            dependencies=frozenset(),
             status=TaskStatus.PENDING
         ))
         
@@ -249,7 +448,7 @@ class AgentOrchestrator:
             id="set_target",
             role=AgentRole.PROJECT_MANAGER,
             action="set_chip_target",
-            dependencies=["setup_project"],
+            dependencies=frozenset({"setup_project"}),
             status=TaskStatus.PENDING
         ))
         
@@ -258,19 +457,19 @@ class AgentOrchestrator:
             id="build_firmware",
             role=AgentRole.BUILDER,
             action="compile_and_cache",
-            dependencies=["set_target"],
+            dependencies=frozenset({"set_target"}),
             status=TaskStatus.PENDING
         ))
         
         # Phase 3: Testing (PARALLEL)
+        build_deps = frozenset({"build_firmware"})
         if flash_device:
             tasks.append(Task(
                 id="flash_device",
                 role=AgentRole.TESTER,
                 action="flash_to_hardware",
-                dependencies=["build_firmware"],
-                status=TaskStatus.PENDING,
-                can_parallelize=True  # Can run parallel with QEMU
+                dependencies=build_deps,
+                status=TaskStatus.PENDING  # Runs in parallel with QEMU (same dependencies)
             ))
         
         if run_qemu:
@@ -278,34 +477,27 @@ class AgentOrchestrator:
                 id="run_simulation",
                 role=AgentRole.TESTER,
                 action="start_qemu",
-                dependencies=["build_firmware"],
-                status=TaskStatus.PENDING,
-                can_parallelize=True  # Can run parallel with flash
+                dependencies=build_deps,
+                status=TaskStatus.PENDING  # Runs in parallel with flash (same dependencies)
             ))
         
         # Phase 4: Validation (PARALLEL)
-        validation_deps = []
-        if flash_device:
-            validation_deps.append("flash_device")
-        if run_qemu:
-            validation_deps.append("run_simulation")
-        
+        # Each check waits only on the testing task whose output it uses:
+        # doctor follows flashing, QA follows the QEMU run
         tasks.append(Task(
             id="hardware_check",
             role=AgentRole.DOCTOR,
             action="run_diagnostics",
-            dependencies=validation_deps,
-            status=TaskStatus.PENDING,
-            can_parallelize=True  # Can run parallel with QA
+            dependencies=frozenset({"flash_device"}) if flash_device else build_deps,
+            status=TaskStatus.PENDING  # Pipelined: flash -> doctor
         ))
         
         tasks.append(Task(
             id="qa_analysis",
             role=AgentRole.QA,
             action="analyze_results",
-            dependencies=validation_deps,
-            status=TaskStatus.PENDING,
-            can_parallelize=True  # Can run parallel with doctor
+            dependencies=frozenset({"run_simulation"}) if run_qemu else build_deps,
+            status=TaskStatus.PENDING  # Pipelined: QEMU -> QA
         ))
         
         return tasks
@@ -321,160 +513,231 @@ class AgentOrchestrator:
         task_map = {task.id: task for task in tasks}
         self.state.tasks = task_map
         
-        completed_tasks = set()
+        # Track unmet dependencies incrementally instead of rescanning every task
+        sorter = self._sorter = DynamicSorter()
         results = {}
+        running: Dict[asyncio.Task, Task] = {}
         
-        while len(completed_tasks) < len(tasks):
-            # Find tasks ready to execute
-            ready_tasks = []
-            parallel_tasks = []
-            
-            for task_id, task in task_map.items():
-                if task_id in completed_tasks:
-                    continue
-                    
-                # Check if dependencies are met
-                deps_met = all(dep in completed_tasks for dep in task.dependencies)
+        # Tasks that already completed on the same sources are restored, not rerun
+        restored = await self._load_completed_tasks(tasks)
+        for task in tasks:
+            if task.id in restored:
+                self._restore_task(task, restored[task.id])
+                self._complete_task(task_map, task, task.result, results)
+        for task in tasks:
+            if task.id not in restored:
+                sorter.add(task.id, *task.dependencies)
+        
+        # The task group cancels every in-flight task if the workflow is
+        # cancelled or an unexpected exception escapes, so no branch (e.g.
+        # a QEMU simulation) is left running on its own
+        async with asyncio.TaskGroup() as group:
+            while sorter.is_active():
+                # Dispatch every newly unblocked task right away: tasks that are
+                # ready together are independent, ordering lives in the dependencies
+                for task_id in sorter.get_ready():
+                    task = task_map[task_id]
+                    running[group.create_task(self._execute_task(task), name=task_id)] = task
                 
-                if deps_met and task.status == TaskStatus.PENDING:
-                    if task.can_parallelize:
-                        parallel_tasks.append(task)
-                    else:
-                        ready_tasks.append(task)
-            
-            # Execute sequential tasks first
-            for task in ready_tasks:
-                result = await self._execute_task(task)
-                results[task.id] = result
-                completed_tasks.add(task.id)
+                # Break if no progress (remaining tasks depend on unknown tasks)
+                if not running:
+                    break
                 
-                # Check for QA feedback loop
-                if task.id == "qa_analysis" and not result.get("passed", True):
-                    if self.state.qa_iterations < self.state.max_qa_iterations:
-                        # Add fix and rebuild tasks
-                        await self._handle_qa_feedback(task_map, result)
-                    else:
-                        print(f"⚠️  Max QA iterations reached ({self.state.max_qa_iterations})")
-            
-            # Execute parallel tasks concurrently
-            if parallel_tasks:
-                parallel_results = await asyncio.gather(
-                    *[self._execute_task(task) for task in parallel_tasks],
-                    return_exceptions=True
-                )
-                
-                for task, result in zip(parallel_tasks, parallel_results):
-                    if isinstance(result, Exception):
+                # Reap whichever task finishes first and unblock its successors
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    task = running.pop(finished)
+                    try:
+                        result = finished.result()
+                    except Exception as e:
                         task.status = TaskStatus.FAILED
-                        task.error = str(result)
-                        results[task.id] = {"success": False, "error": str(result)}
-                    else:
-                        results[task.id] = result
-                    completed_tasks.add(task.id)
-            
-            # Break if no progress
-            if not ready_tasks and not parallel_tasks:
-                break
+                        task.error = str(e)
+                        result = {"success": False, "error": str(e)}
+                    await self._record_completed(task, result)
+                    self._complete_task(task_map, task, result, results)
         
         return results
     
+    async def _load_completed_tasks(self, tasks: List[Task]) -> Dict[str, Dict[str, Any]]:
+        """
+        Load results of planned tasks that completed in an earlier run on the
+        same sources (same fingerprint as the build cache).
+        
+        Returns:
+            task id -> result for tasks that can be skipped
+        """
+        self._journal = TaskJournal(Path(self.state.project_path) / ".agent" / TASK_JOURNAL_NAME)
+        inputs_hash = await asyncio.to_thread(_source_fingerprint, self.state.project_path, self.state.target)
+        if not inputs_hash:
+            self._inputs_hash = {}
+            return {}
+        
+        self._inputs_hash = {task.id: inputs_hash for task in tasks}
+        try:
+            previous = await asyncio.to_thread(self._journal.compact, inputs_hash)
+        except OSError as e:
+            logger.warning("⚠️  Failed to compact task journal: %s", e)
+            previous = await asyncio.to_thread(self._journal.load)
+        
+        # Walk dependencies first: a task is restored only if everything it
+        # depends on was restored too, otherwise its inputs are rerun and
+        # its journaled result is stale
+        task_map = {task.id: task for task in tasks}
+        order = graphlib.TopologicalSorter({task.id: task.dependencies for task in tasks}).static_order()
+        restored = {}
+        for task_id in order:
+            task = task_map.get(task_id)
+            if task is None or not all(dep in restored for dep in task.dependencies):
+                continue
+            result = previous.get((task.id, task.action, inputs_hash))
+            if result is not None:
+                restored[task.id] = result
+        return restored
+    
+    def _restore_task(self, task: Task, result: Dict[str, Any]):
+        """Mark a task completed from a journaled result (and restore its artifacts)"""
+        task.status = TaskStatus.COMPLETED
+        task.result = result
+        artifact = ACTION_ARTIFACTS.get(task.action)
+        if artifact and result.get(artifact[1]) is not None:
+            self.state.artifacts[artifact[0]] = result[artifact[1]]
+        logger.info("⏭️  Restored [%s] %s from previous run", _ROLE_LABEL[task.role], task.action)
+    
+    async def _record_completed(self, task: Task, result: Dict[str, Any]):
+        """Journal a successfully completed planned task so a rerun can skip it"""
+        inputs_hash = self._inputs_hash.get(task.id)
+        if not inputs_hash or task.status != TaskStatus.COMPLETED or task.action in UNJOURNALED_ACTIONS:
+            return
+        try:
+            await asyncio.to_thread(self._journal.append, task.id, task.action, inputs_hash, result)
+        except OSError as e:
+            logger.warning("⚠️  Failed to record task %s: %s", task.id, e)
+    
+    def _complete_task(
+        self,
+        task_map: Dict[str, Task],
+        task: Task,
+        result: Dict[str, Any],
+        results: Dict[str, Any]
+    ):
+        """Record a finished task and release the tasks that depend on it"""
+        results[task.id] = result
+        self._sorter.done(task.id)
+        
+        # Check for QA feedback loop (initial analysis or a retest)
+        if task.action == "analyze_results" and not result.get("passed", True):
+            if self.state.qa_iterations < self.state.max_qa_iterations:
+                # Schedule fix, rebuild and retest tasks
+                self._handle_qa_feedback(task_map, result)
+            else:
+                logger.warning("⚠️  Max QA iterations reached (%d)", self.state.max_qa_iterations)
+    
     async def _execute_task(self, task: Task) -> Dict[str, Any]:
-        """Execute a single task using appropriate agent tools"""
-        print(f"🚀 Executing [{task.role.value}] {task.action} (task: {task.id})")
+        """Execute a single task, waiting for a free slot of its agent role"""
+        async with self._role_sem[task.role]:
+            return await self._run_task(task)
+    
+    async def _run_task(self, task: Task) -> Dict[str, Any]:
+        """Run a single task using appropriate agent tools"""
+        label = _ROLE_LABEL[task.role]
+        logger.info("🚀 Executing [%s] %s (task: %s)", label, task.action, task.id)
         task.status = TaskStatus.IN_PROGRESS
-        task.timestamp = datetime.now()
+        task.start_ns = time.monotonic_ns()
         
         try:
             # Route task to appropriate handler
-            if task.action == "validate_project_structure":
-                result = await self._project_manager_validate()
-            elif task.action == "set_chip_target":
-                result = await self._project_manager_set_target()
-            elif task.action == "compile_and_cache":
-                result = await self._builder_compile()
-            elif task.action == "flash_to_hardware":
-                result = await self._tester_flash()
-            elif task.action == "start_qemu":
-                result = await self._tester_qemu()
-            elif task.action == "run_diagnostics":
-                result = await self._doctor_check()
-            elif task.action == "analyze_results":
-                result = await self._qa_analyze()
-            elif task.action == "fix_issues":
-                result = await self._developer_fix(task.result.get("issues", []))
+            handler = self._handlers.get(task.action)
+            if handler:
+                result = await handler(task)
             else:
                 result = {"success": False, "error": f"Unknown action: {task.action}"}
             
             task.status = TaskStatus.COMPLETED if result.get("success") else TaskStatus.FAILED
             task.result = result
             
-            print(f"✅ Completed [{task.role.value}] {task.action}")
+            logger.info("✅ Completed [%s] %s", label, task.action)
             return result
             
         except Exception as e:
             task.status = TaskStatus.FAILED
             task.error = str(e)
-            print(f"❌ Failed [{task.role.value}] {task.action}: {e}")
+            logger.error("❌ Failed [%s] %s: %s", label, task.action, e)
             return {"success": False, "error": str(e)}
     
-    async def _handle_qa_feedback(
+    def _handle_qa_feedback(
         self, task_map: Dict[str, Task], qa_result: Dict[str, Any]
     ):
         """
-        Handle QA feedback loop: Developer fixes -> Rebuild -> Retest
+        Handle QA feedback loop: Developer fixes -> Rebuild -> (QEMU) -> Retest
+        
+        The new tasks are added to the running scheduler, which starts each
+        one as soon as its dependency completes (alongside any task still
+        running from the main workflow).
         
         Args:
             task_map: Current task map
             qa_result: QA analysis with detected issues
         """
         self.state.qa_iterations += 1
-        print(f"\n🔄 QA Feedback Loop - Iteration {self.state.qa_iterations}")
-        print(f"   Issues found: {len(qa_result.get('issues', []))}")
+        logger.info(
+            "\n🔄 QA Feedback Loop - Iteration %d\n   Issues found: %d",
+            self.state.qa_iterations, len(qa_result.get("issues", []))
+        )
         
         # Create fix task
         fix_task = Task(
             id=f"fix_issues_{self.state.qa_iterations}",
             role=AgentRole.DEVELOPER,
             action="fix_issues",
-            dependencies=[],
+            dependencies=frozenset(),
             status=TaskStatus.PENDING
         )
         fix_task.result = {"issues": qa_result.get("issues", [])}
         
-        # Add to workflow
-        task_map[fix_task.id] = fix_task
-        
-        # Execute fix
-        await self._execute_task(fix_task)
-        
-        # Rebuild
+        # Rebuild (after the fix only)
         rebuild_task = Task(
             id=f"rebuild_{self.state.qa_iterations}",
             role=AgentRole.BUILDER,
             action="compile_and_cache",
-            dependencies=[fix_task.id],
+            dependencies=frozenset({fix_task.id}),
             status=TaskStatus.PENDING
         )
-        task_map[rebuild_task.id] = rebuild_task
-        await self._execute_task(rebuild_task)
         
-        # Retest
-        retest_task = Task(
+        feedback_tasks = [fix_task, rebuild_task]
+        
+        # Rerun the simulation on the new firmware, so the retest does not
+        # judge the previous run's output (and its errors) again
+        retest_deps = frozenset({rebuild_task.id})
+        if "run_simulation" in task_map:
+            rerun_task = Task(
+                id=f"rerun_simulation_{self.state.qa_iterations}",
+                role=AgentRole.TESTER,
+                action="start_qemu",
+                dependencies=retest_deps,
+                status=TaskStatus.PENDING
+            )
+            feedback_tasks.append(rerun_task)
+            retest_deps = frozenset({rerun_task.id})
+        
+        # Retest (after the rebuild, or the rerun simulation)
+        feedback_tasks.append(Task(
             id=f"retest_{self.state.qa_iterations}",
             role=AgentRole.QA,
             action="analyze_results",
-            dependencies=[rebuild_task.id],
+            dependencies=retest_deps,
             status=TaskStatus.PENDING
-        )
-        task_map[retest_task.id] = retest_task
-        await self._execute_task(retest_task)
+        ))
+        
+        # Add to workflow and scheduler
+        for feedback_task in feedback_tasks:
+            task_map[feedback_task.id] = feedback_task
+            self._sorter.add(feedback_task.id, *feedback_task.dependencies)
     
     # Agent action implementations
     
     async def _project_manager_validate(self) -> Dict[str, Any]:
         """Validate project structure"""
-        tool = self.tools["list_files"]
-        result = tool.invoke(".")
+        result = await asyncio.to_thread(self._tool_invoke[Tool.LIST_FILES], ".")
         return {
             "success": "CMakeLists.txt" in result,
             "structure": result
@@ -482,35 +745,45 @@ class AgentOrchestrator:
     
     async def _project_manager_set_target(self) -> Dict[str, Any]:
         """Set target chip"""
-        tool = self.tools["idf_set_target"]
-        result = tool.invoke(self.state.target)
+        result = await asyncio.to_thread(self._tool_invoke[Tool.IDF_SET_TARGET], self.state.target)
         return {"success": True, "output": result}
     
     async def _builder_compile(self) -> Dict[str, Any]:
         """Compile firmware and cache artifacts"""
-        await self._update_agent_status("build", "active")
-        await self._emit_event("INFO", "🔨 Build agent compiling firmware", agent_id="build")
-        await self._emit_progress("build", 0, "Starting compilation", agent_id="build")
+        self._update_agent_status("build", "active")
+        self._emit_event("INFO", "🔨 Build agent compiling firmware", agent_id="build")
+        self._emit_progress("build", 0, "Starting compilation", agent_id="build")
+        
+        # Skip the build when sources are unchanged since the last successful one
+        key = await asyncio.to_thread(_source_fingerprint, self.state.project_path, self.state.target)
+        cached = self._build_cache.get(key) if key else None
+        if cached is not None:
+            self.state.artifacts["build"] = cached
+            self._emit_progress("build", 100, "Sources unchanged, reusing cached build", agent_id="build")
+            self._emit_event("SUCCESS", "✅ Build up to date (cached)", agent_id="build")
+            self._update_agent_status("build", "idle")
+            return {"success": True, "output": "cached", "artifacts": cached}
         
-        tool = self.tools["idf_build"]
-        result = tool.invoke("")
+        invoke = self._tool_invoke
+        result = await asyncio.to_thread(invoke[Tool.IDF_BUILD], "")
         
         success = "error" not in result.lower()
         
         if success:
-            await self._emit_progress("build", 50, "Compilation successful, getting artifacts", agent_id="build")
+            self._emit_progress("build", 50, "Compilation successful, getting artifacts", agent_id="build")
             # Get artifacts
-            artifacts_tool = self.tools["get_build_artifacts"]
-            artifacts = artifacts_tool.invoke("")
+            artifacts = await asyncio.to_thread(invoke[Tool.GET_BUILD_ARTIFACTS], "")
             self.state.artifacts["build"] = artifacts
+            if key:
+                self._build_cache[key] = artifacts
             
-            await self._emit_progress("build", 100, "Build completed successfully", agent_id="build")
-            await self._emit_event("SUCCESS", "✅ Build successful", agent_id="build")
+            self._emit_progress("build", 100, "Build completed successfully", agent_id="build")
+            self._emit_event("SUCCESS", "✅ Build successful", agent_id="build")
         else:
-            await self._emit_event("ERROR", "❌ Build failed", agent_id="build")
+            self._emit_event("ERROR", "❌ Build failed", agent_id="build")
             artifacts = None
         
-        await self._update_agent_status("build", "idle")
+        self._update_agent_status("build", "idle")
         
         return {
             "success": success,
@@ -520,8 +793,8 @@ class AgentOrchestrator:
     
     async def _tester_flash(self) -> Dict[str, Any]:
         """Flash to hardware using cached artifacts"""
-        tool = self.tools["idf_flash"]
-        result = tool.invoke({
+        # Blocking tools run in worker threads so flash and QEMU overlap
+        result = await asyncio.to_thread(self._tool_invoke[Tool.IDF_FLASH], {
             "port": "/dev/cu.usbmodem21101",
             "use_cached": True
         })
@@ -532,15 +805,28 @@ class AgentOrchestrator:
     
     async def _tester_qemu(self) -> Dict[str, Any]:
         """Start QEMU simulation"""
-        tool = self.tools["run_qemu_simulation"]
-        result = tool.invoke({"target": self.state.target})
-        
-        # Wait for simulation to start
-        await asyncio.sleep(3)
-        
-        # Get output
-        output_tool = self.tools["qemu_get_output"]
-        output = output_tool.invoke({"lines": 100})
+        invoke = self._tool_invoke
+        start = asyncio.ensure_future(
+            asyncio.to_thread(invoke[Tool.RUN_QEMU_SIMULATION], {"target": self.state.target})
+        )
+        try:
+            # Shielded: cancelling must not orphan the start call's thread
+            await asyncio.shield(start)
+            
+            # Poll output until the app greets us (or the boot timeout expires)
+            deadline = time.monotonic() + QEMU_BOOT_TIMEOUT
+            while True:
+                await asyncio.sleep(QEMU_POLL_INTERVAL)
+                output = await asyncio.to_thread(invoke[Tool.QEMU_GET_OUTPUT], {"lines": QEMU_OUTPUT_LINES})
+                if "Hello World" in output or time.monotonic() >= deadline:
+                    break
+        except asyncio.CancelledError:
+            # Workflow aborted: don't leave the simulation running; if it was
+            # still starting, wait for the start so the stop comes after it
+            if "stop_qemu_simulation" in self.tools:
+                await asyncio.gather(start, return_exceptions=True)
+                await asyncio.to_thread(invoke[Tool.STOP_QEMU_SIMULATION], "")
+            raise
         
         self.state.artifacts["qemu_output"] = output
         
@@ -551,8 +837,9 @@ class AgentOrchestrator:
     
     async def _doctor_check(self) -> Dict[str, Any]:
         """Run hardware diagnostics"""
-        tool = self.tools["idf_doctor"]
-        result = tool.invoke("")
+        # Run off the event loop so QA analysis progresses in parallel
+        result = await asyncio.to_thread(self._tool_invoke[Tool.IDF_DOCTOR], "")
+        self.state.artifacts["doctor_report"] = result
         return {
             "success": "error" not in result.lower(),
             "report": result
@@ -569,15 +856,18 @@ class AgentOrchestrator:
         - Memory usage
         - Expected behaviors
         """
-        await self._update_agent_status("test", "active")
-        await self._emit_event("INFO", "🔍 Test agent analyzing results", agent_id="test")
-        await self._emit_progress("validate", 0, "Starting validation", agent_id="test")
+        self._update_agent_status("test", "active")
+        self._emit_event("INFO", "🔍 Test agent analyzing results", agent_id="test")
+        self._emit_progress("validate", 0, "Starting validation", agent_id="test")
         
         issues = []
         
+        # Cheapest checks first; with fast_fail a high-severity issue ends the analysis
+        fatal = False
+        
         # Check build
         if "build" in self.state.artifacts:
-            await self._emit_progress("validate", 25, "Checking build artifacts", agent_id="test")
+            self._emit_progress("validate", 25, "Checking build artifacts", agent_id="test")
             build_info = self.state.artifacts["build"]
             if "error" in str(build_info).lower():
                 issues.append({
@@ -585,24 +875,30 @@ class AgentOrchestrator:
                     "component": "build",
                     "message": "Build errors detected"
                 })
-                await self._emit_event("WARNING", "⚠️  Build errors detected", agent_id="test")
+                fatal = True
+                self._emit_event("WARNING", "⚠️  Build errors detected", agent_id="test")
         
         # Check QEMU output
-        if "qemu_output" in self.state.artifacts:
-            await self._emit_progress("validate", 50, "Analyzing QEMU output", agent_id="test")
+        if "qemu_output" in self.state.artifacts and not (fatal and self.state.fast_fail):
+            self._emit_progress("validate", 50, "Analyzing QEMU output", agent_id="test")
             output = self.state.artifacts["qemu_output"]
+            hits = set()
+            for match in self._QA_PATTERN.finditer(output):
+                hits.add(match.group(0).lower())
+                if len(hits) > 1 and "hello world" in hits:
+                    break  # Greeting and a runtime error both seen: nothing left to find
             
             # Check for expected patterns
-            if "Hello World" not in output:
+            if "hello world" not in hits:
                 issues.append({
                     "severity": "high",
                     "component": "application",
                     "message": "Expected 'Hello World' output not found in QEMU"
                 })
-                await self._emit_event("WARNING", "⚠️  Expected output not found", agent_id="test")
+                self._emit_event("WARNING", "⚠️  Expected output not found", agent_id="test")
             
             # Check for errors/warnings
-            if "error" in output.lower() or "abort" in output.lower():
+            if "error" in hits or "abort" in hits:
                 issues.append({
                     "severity": "medium",
                     "component": "runtime",
@@ -612,14 +908,14 @@ class AgentOrchestrator:
         # Generate report
         passed = len(issues) == 0
         
-        await self._emit_progress("validate", 100, f"Validation complete: {len(issues)} issues found", agent_id="test")
+        self._emit_progress("validate", 100, f"Validation complete: {len(issues)} issues found", agent_id="test")
         
         if passed:
-            await self._emit_event("SUCCESS", "✅ All validations passed", agent_id="test")
+            self._emit_event("SUCCESS", "✅ All validations passed", agent_id="test")
         else:
-            await self._emit_event("WARNING", f"⚠️  Found {len(issues)} issues", agent_id="test")
+            self._emit_event("WARNING", f"⚠️  Found {len(issues)} issues", agent_id="test")
         
-        await self._update_agent_status("test", "idle")
+        self._update_agent_status("test", "idle")
         
         return {
             "success": True,
@@ -636,95 +932,43 @@ class AgentOrchestrator:
         Uses ESP32CodeFixer to analyze build errors and generate fixes.
         Reads buggy code from files, applies fixes, and writes back.
         """
-        print(f"🔧 Developer fixing {len(issues)} issues with LLM...")
-        await self._update_agent_status("developer", "active")
-        await self._emit_event("INFO", f"🔧 Developer agent fixing {len(issues)} issues", agent_id="developer")
-        await self._emit_progress("fix", 0, f"Starting to fix {len(issues)} issues", agent_id="developer")
-        
-        fixes_applied = []
-        fixes_failed = []
+        logger.info("🔧 Developer fixing %d issues with LLM...", len(issues))
+        self._update_agent_status("developer", "active")
+        self._emit_event("INFO", f"🔧 Developer agent fixing {len(issues)} issues", agent_id="developer")
+        self._emit_progress("fix", 0, f"Starting to fix {len(issues)} issues", agent_id="developer")
         
+        # Issues in different files are fixed concurrently; issues in the
+        # same file are chained so each fix sees the previous one's output
+        by_file: Dict[Any, List[Tuple[int, Dict[str, Any]]]] = {}
         for idx, issue in enumerate(issues, 1):
-            progress = int((idx / len(issues)) * 100)
-            print(f"\n   [{idx}/{len(issues)}] {issue['severity']}: {issue['message']}")
-            await self._emit_progress("fix", progress, f"Fixing issue {idx}/{len(issues)}", agent_id="developer")
-            
-            # Extract file path and error details
-            file_path = issue.get("file")
-            component = issue.get("component", "unknown")
-            error_message = issue.get("message", "")
-            
-            if not file_path or not os.path.exists(file_path):
-                print(f"   ⚠️  File not found: {file_path}")
-                fixes_failed.append({
-                    "issue": error_message,
-                    "reason": "File not accessible",
-                    "component": component
-                })
-                continue
-            
-            try:
-                # Read buggy code
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    buggy_code = f.read()
-                
-                print(f"   🔍 Analyzing {Path(file_path).name}...")
-                
-                # Use LLM to fix the code
-                result = self.code_fixer.fix_code(
-                    buggy_code=buggy_code,
-                    error_message=error_message,
-                    filename=Path(file_path).name,
-                    component=component
-                )
-                
-                if result.success and result.fixed_code:
-                    # Write fixed code back to file
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(result.fixed_code)
-                    
-                    print(f"   ✅ Fixed! Confidence: {result.confidence}")
-                    print(f"   📝 Changes: {result.changes_made}")
-                    await self._emit_event("SUCCESS", f"✅ Fixed {Path(file_path).name}: {result.changes_made[:100]}", agent_id="developer")
-                    
-                    fixes_applied.append({
-                        "issue": error_message,
-                        "fix": result.changes_made,
-                        "component": component,
-                        "file": file_path,
-                        "confidence": result.confidence,
-                        "diagnosis": result.diagnosis
-                    })
-                else:
-                    print(f"   ❌ Failed: {result.error}")
-                    await self._emit_event("WARNING", f"❌ Failed to fix {Path(file_path).name}: {result.error}", agent_id="developer")
-                    fixes_failed.append({
-                        "issue": error_message,
-                        "reason": result.error or "LLM could not generate fix",
-                        "component": component
-                    })
-                    
-            except Exception as e:
-                print(f"   ❌ Exception: {str(e)}")
-                fixes_failed.append({
-                    "issue": error_message,
-                    "reason": f"Exception: {str(e)}",
-                    "component": component
-                })
+            by_file.setdefault(issue.get("file"), []).append((idx, issue))
+        
+        diagnostics = await self._diagnostics_report()
+        fixed_count = itertools.count(1)
+        outcomes = await asyncio.gather(*(
+            self._fix_file_issues(file_issues, len(issues), fixed_count, diagnostics)
+            for file_issues in by_file.values()
+        ))
+        
+        # Report in issue order regardless of completion order
+        ordered = sorted(outcome for group in outcomes for outcome in group)
+        fixes_applied = [fix for _, fix, ok in ordered if ok]
+        fixes_failed = [fix for _, fix, ok in ordered if not ok]
         
         success = len(fixes_applied) > 0
         
-        print(f"\n📊 Fix Summary:")
-        print(f"   ✅ Applied: {len(fixes_applied)}")
-        print(f"   ❌ Failed: {len(fixes_failed)}")
+        logger.info(
+            "\n📊 Fix Summary:\n   ✅ Applied: %d\n   ❌ Failed: %d",
+            len(fixes_applied), len(fixes_failed)
+        )
         
-        await self._emit_progress("fix", 100, f"Completed: {len(fixes_applied)} fixes applied, {len(fixes_failed)} failed", agent_id="developer")
-        await self._update_agent_status("developer", "idle")
+        self._emit_progress("fix", 100, f"Completed: {len(fixes_applied)} fixes applied, {len(fixes_failed)} failed", agent_id="developer")
+        self._update_agent_status("developer", "idle")
         
         if success:
-            await self._emit_event("SUCCESS", f"🎉 Developer agent completed: {len(fixes_applied)} fixes applied", agent_id="developer")
+            self._emit_event("SUCCESS", f"🎉 Developer agent completed: {len(fixes_applied)} fixes applied", agent_id="developer")
         else:
-            await self._emit_event("ERROR", f"❌ Developer agent failed to apply any fixes", agent_id="developer")
+            self._emit_event("ERROR", f"❌ Developer agent failed to apply any fixes", agent_id="developer")
         
         return {
             "success": success,
@@ -732,12 +976,123 @@ class AgentOrchestrator:
             "failures": fixes_failed
         }
     
+    def _read_cached(self, file_path: str) -> str:
+        """Read a source file, reusing the last read while it is unchanged on disk"""
+        st = os.stat(file_path)
+        cached = self._file_cache.get(file_path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        content = Path(file_path).read_text(encoding="utf-8")
+        self._file_cache[file_path] = (st.st_mtime_ns, st.st_size, content)
+        return content
+    
+    async def _diagnostics_report(self) -> Optional[str]:
+        """
+        idf.py doctor output used to retry low-confidence fixes: reused from
+        the hardware check if it ran, else run once (None if unavailable)
+        """
+        report = self.state.artifacts.get("doctor_report")
+        if report is None and "idf_doctor" in self.tools:
+            try:
+                report = await asyncio.to_thread(self._tool_invoke[Tool.IDF_DOCTOR], "")
+            except Exception as e:
+                logger.warning("⚠️  Diagnostics failed: %s", e)
+        return report
+    
+    async def _fix_file_issues(
+        self,
+        file_issues: List[Tuple[int, Dict[str, Any]]],
+        total: int,
+        fixed_count: Iterator[int],
+        diagnostics: Optional[str]
+    ) -> List[Tuple[int, Dict[str, Any], bool]]:
+        """Fix the issues of one file in order; returns (index, record, applied)
+        
+        fixed_count is shared by all files of one fix task and numbers
+        finished issues for progress reporting.
+        """
+        outcomes = []
+        for idx, issue in file_issues:
+            record, applied = await self._fix_one_issue(idx, total, issue, diagnostics)
+            outcomes.append((idx, record, applied))
+            done = next(fixed_count)
+            self._emit_progress("fix", int((done / total) * 100), f"Fixed {done}/{total} issues", agent_id="developer")
+        return outcomes
+    
+    async def _fix_one_issue(
+        self, idx: int, total: int, issue: Dict[str, Any], diagnostics: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Fix a single issue; returns (fix or failure record, applied)"""
+        logger.info("\n   [%d/%d] %s: %s", idx, total, issue["severity"], issue["message"])
+        
+        # Extract file path and error details
+        file_path = issue.get("file")
+        component = issue.get("component", "unknown")
+        error_message = issue.get("message", "")
+        
+        if not file_path or not os.path.exists(file_path):
+            logger.warning("   ⚠️  File not found: %s", file_path)
+            return {
+                "issue": error_message,
+                "reason": "File not accessible",
+                "component": component
+            }, False
+        
+        try:
+            # Read buggy code
+            buggy_code = await asyncio.to_thread(self._read_cached, file_path)
+            
+            logger.info("   🔍 Analyzing %s...", Path(file_path).name)
+            
+            # Use LLM to fix the code
+            result = await asyncio.to_thread(
+                self.code_fixer.fix_code,
+                buggy_code=buggy_code,
+                error_message=error_message,
+                filename=Path(file_path).name,
+                component=component,
+                diagnostics_report=diagnostics
+            )
+            
+            if result.success and result.fixed_code:
+                # Write fixed code back to file
+                await asyncio.to_thread(Path(file_path).write_text, result.fixed_code, encoding="utf-8")
+                self._file_cache.pop(file_path, None)
+                
+                logger.info("   ✅ Fixed! Confidence: %s\n   📝 Changes: %s", result.confidence, result.changes_made)
+                self._emit_event("SUCCESS", f"✅ Fixed {Path(file_path).name}: {result.changes_made[:100]}", agent_id="developer")
+                
+                return {
+                    "issue": error_message,
+                    "fix": result.changes_made,
+                    "component": component,
+                    "file": file_path,
+                    "confidence": result.confidence,
+                    "diagnosis": result.diagnosis
+                }, True
+            
+            logger.error("   ❌ Failed: %s", result.error)
+            self._emit_event("WARNING", f"❌ Failed to fix {Path(file_path).name}: {result.error}", agent_id="developer")
+            return {
+                "issue": error_message,
+                "reason": result.error or "LLM could not generate fix",
+                "component": component
+            }, False
+                
+        except Exception as e:
+            logger.error("   ❌ Exception: %s", e)
+            return {
+                "issue": error_message,
+                "reason": f"Exception: {str(e)}",
+                "component": component
+            }, False
+    
     def get_workflow_summary(self) -> str:
         """Get human-readable workflow summary"""
         if not self.state:
             return "No workflow executed yet"
         
-        summary = f"""
+        parts = [f"""
 ╔══════════════════════════════════════════════════════════════╗
 ║             ESP32 Development Workflow Summary               ║
 ╚══════════════════════════════════════════════════════════════╝
@@ -747,16 +1102,9 @@ class AgentOrchestrator:
 🔄 QA Iterations: {self.state.qa_iterations}/{self.state.max_qa_iterations}
 
 Tasks:
-"""
-        for task_id, task in self.state.tasks.items():
-            status_icon = {
-                TaskStatus.COMPLETED: "✅",
-                TaskStatus.FAILED: "❌",
-                TaskStatus.IN_PROGRESS: "🔄",
-                TaskStatus.PENDING: "⏳",
-                TaskStatus.BLOCKED: "🚫"
-            }.get(task.status, "❓")
-            
-            summary += f"  {status_icon} [{task.role.value}] {task.action}\n"
-        
-        return summary
+"""]
+        parts.extend(
+            f"  {_STATUS_ICONS.get(task.status, '❓')} [{_ROLE_LABEL[task.role]}] {task.action}\n"
+            for task in self.state.tasks.values()
+        )
+        return "".join(parts)
@@ -101,6 +101,15 @@ SIMPLE_FIX_PROMPT = """Fix this ESP32 code error:
 Provide ONLY the fixed code, nothing else. Include all necessary #include statements at the top.
 """
 
+# Prompt for fixing several independent cases in one request
+BATCH_FIX_PROMPT = """You will fix {count} independent ESP32 code errors.
+
+Respond with a JSON array containing exactly {count} objects, one per case and in the same order.
+Each object must follow the JSON format specified in your system prompt.
+
+{cases}
+"""
+
 # Prompt for validating a fix
 VALIDATE_FIX_PROMPT = """You previously provided a fix for ESP32 code. The build result is:
 
@@ -256,3 +265,11 @@ def get_simple_fix_prompt(error_message: str, code: str) -> str:
         error_message=error_message,
         code=code
     )
+
+
+def get_batch_fix_prompt(prompts: list) -> str:
+    """Combine several fix prompts into a single batched request"""
+    cases = "\n\n".join(
+        f"### Case {i}\n{prompt}" for i, prompt in enumerate(prompts, 1)
+    )
+    return BATCH_FIX_PROMPT.format(count=len(prompts), cases=cases)
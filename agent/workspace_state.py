@@ -0,0 +1,160 @@
+"""
+Persistent agent state for the ESP-IDF workspace
+Stored as /workspace/.agent/state.json so later turns can reuse earlier results
+"""
+
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+WORKSPACE_DIR = os.getenv("WORKSPACE_DIR", "/workspace")
+STATE_PATH = Path(WORKSPACE_DIR) / ".agent" / "state.json"
+
+# Each field is trimmed to this many characters (tail) when persisted
+MAX_FIELD_CHARS = 4000
+
+# Completed workflow tasks, one JSON object per line (under <project>/.agent/)
+TASK_JOURNAL_NAME = "tasks.jsonl"
+
+
+@dataclass
+class WorkspaceState:
+    """Last known build/doctor/fix results for the workspace"""
+    project_dir: str = ""
+    last_error: str = ""
+    last_build_tail: str = ""
+    last_doctor: str = ""
+    last_fix_diagnosis: str = ""
+    file_hashes: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path = STATE_PATH, project_dir: Optional[str] = None) -> "WorkspaceState":
+        """Load state from disk (empty state if missing, unreadable or recorded for another project)
+
+        project_dir: project the state must belong to (default: the directory holding .agent/)
+        """
+        project_dir = str(Path(project_dir or Path(path).parent.parent).resolve())
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(project_dir=project_dir)
+        if not isinstance(data, dict) or data.get("project_dir") != project_dir:
+            return cls(project_dir=project_dir)
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known})
+
+    def save(self, path: Path = STATE_PATH) -> None:
+        """Atomically write state to disk (temp file + os.replace)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = asdict(self)
+        for key in ("last_error", "last_build_tail", "last_doctor", "last_fix_diagnosis"):
+            data[key] = data[key][-MAX_FIELD_CHARS:]
+
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".state-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def to_prompt(self) -> str:
+        """Render state as a system prompt section ("" if nothing recorded)"""
+        sections = []
+        if self.last_error:
+            sections.append(f"Last error reported:\n{self.last_error}")
+        if self.last_build_tail:
+            sections.append(f"Last build output:\n{self.last_build_tail}")
+        if self.last_doctor:
+            sections.append(f"Last idf.py doctor report:\n{self.last_doctor}")
+        if self.last_fix_diagnosis:
+            sections.append(f"Last fix diagnosis:\n{self.last_fix_diagnosis}")
+        if not sections:
+            return ""
+        return "\n\n**Workspace state (from previous session):**\n" + "\n\n".join(sections)
+
+
+class TaskJournal:
+    """Log of completed workflow tasks, used to resume after a crash
+    
+    Entries are appended as tasks complete; compact() drops those recorded
+    for earlier sources, so the file stays bounded by the workflow size.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+    
+    def load(self) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+        """Map (task_id, action, inputs_hash) -> result ({} if missing or unreadable)"""
+        return self._read()[0]
+    
+    def _read(self) -> Tuple[Dict[Tuple[str, str, str], Dict[str, Any]], int]:
+        """Parse the journal into (entries, number of lines read)"""
+        try:
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return {}, 0
+        
+        entries = {}
+        for line in lines:
+            try:
+                entry = json.loads(line)
+                key = (entry["task_id"], entry["action"], entry["inputs_hash"])
+            except (ValueError, TypeError, KeyError):
+                continue  # e.g. a line torn by a crash mid-write
+            if isinstance(entry.get("result"), dict):
+                entries[key] = entry["result"]
+        return entries, len(lines)
+    
+    def compact(self, inputs_hash: str) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+        """
+        Drop entries recorded for other inputs (and superseded duplicates),
+        rewriting the journal atomically; returns the entries kept.
+        
+        Results for older sources can never be restored again, so without
+        this the journal would grow with every edit-build cycle.
+        """
+        entries, line_count = self._read()
+        kept = {key: result for key, result in entries.items() if key[2] == inputs_hash}
+        if len(kept) == line_count:
+            return kept
+        
+        if not kept:
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+            return kept
+        
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".tasks-", suffix=".jsonl")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for (task_id, action, _), result in kept.items():
+                    f.write(self._line(task_id, action, inputs_hash, result) + "\n")
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return kept
+    
+    def append(self, task_id: str, action: str, inputs_hash: str, result: Dict[str, Any]) -> None:
+        """Record a completed task (one line, appended)"""
+        line = self._line(task_id, action, inputs_hash, result)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    
+    @staticmethod
+    def _line(task_id: str, action: str, inputs_hash: str, result: Dict[str, Any]) -> str:
+        """Serialize one journal entry"""
+        return json.dumps({
+            "task_id": task_id,
+            "action": action,
+            "inputs_hash": inputs_hash,
+            "result": result,
+        }, default=str)
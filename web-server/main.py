@@ -63,7 +63,7 @@ async def lifespan(app: FastAPI):
     # Register event listener to broadcast events via WebSocket
     async def broadcast_event_to_clients(event: Event):
         """Broadcast events to all connected WebSocket clients."""
-        await manager.broadcast_json(event.to_dict())
+        await manager.broadcast(event.to_json())
     
     # Register listeners for all event types
     for event_type in EventType: